@@ -23,6 +23,11 @@ import app.db.models.category
 import app.db.models.item
 import app.db.models.settings
 import app.db.models.users
+import app.db.models.widget
+import app.db.models.schedule
+import app.db.models.schedule_run
+import app.db.models.scheduler_lease
+import app.db.models.table_version
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -32,6 +37,10 @@ target_metadata = Base.metadata
 # Set the SQLAlchemy URL dynamically
 config.set_main_option('sqlalchemy.url', DB_URL)
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The items_fts full-text index and its shadow tables are not in the metadata
+    return not (type_ == "table" and reflected and compare_to is None and name.startswith("items_fts"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -54,6 +63,7 @@ def run_migrations_offline():
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +87,7 @@ def run_migrations_online():
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,28 @@
+"""add table_versions
+
+Revision ID: 0dc1d14f20fd
+Revises: 358bd823fc06
+Create Date: 2026-10-18 17:31:26.804113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0dc1d14f20fd'
+down_revision = '358bd823fc06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
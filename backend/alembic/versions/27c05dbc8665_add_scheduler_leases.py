@@ -0,0 +1,29 @@
+"""add scheduler_leases
+
+Revision ID: 27c05dbc8665
+Revises: c585df396047
+Create Date: 2026-10-18 17:20:09.541207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '27c05dbc8665'
+down_revision = 'c585df396047'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('owner', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
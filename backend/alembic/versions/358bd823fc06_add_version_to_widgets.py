@@ -0,0 +1,25 @@
+"""add version to widgets
+
+Revision ID: 358bd823fc06
+Revises: 27c05dbc8665
+Create Date: 2026-10-18 17:05:41.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '358bd823fc06'
+down_revision = '27c05dbc8665'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('widgets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('widgets') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,26 @@
+"""add owner to schedule_runs
+
+Revision ID: 3e1b7a9c4d52
+Revises: 8052fc49e48d
+Create Date: 2026-10-18 23:58:04.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e1b7a9c4d52'
+down_revision = '8052fc49e48d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('schedule_runs') as batch_op:
+        batch_op.add_column(sa.Column('owner', sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('schedule_runs') as batch_op:
+        batch_op.drop_column('owner')
@@ -0,0 +1,42 @@
+"""add next_run to schedules
+
+Revision ID: 4531a66bb22b
+Revises: 21fdbed62863
+Create Date: 2026-10-18 16:45:12.304518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.recurrence import next_run, utcnow
+
+
+# revision identifiers, used by Alembic.
+revision = '4531a66bb22b'
+down_revision = '21fdbed62863'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('schedules', sa.Column('next_run', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_schedules_next_run'), 'schedules', ['next_run'], unique=False)
+    # Backfill: existing rows only get a next_run if they still have a future fire
+    conn = op.get_bind()
+    now = utcnow()
+    rows = conn.execute(sa.text('SELECT id, time, "repeat" FROM schedules')).fetchall()
+    for schedule_id, time_value, repeat in rows:
+        try:
+            value = next_run(time_value, repeat, after=now)
+        except ValueError:
+            value = None
+        if value is not None:
+            conn.execute(
+                sa.text('UPDATE schedules SET next_run = :next_run WHERE id = :id'),
+                {"next_run": value, "id": schedule_id},
+            )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_schedules_next_run'), table_name='schedules')
+    with op.batch_alter_table('schedules') as batch_op:
+        batch_op.drop_column('next_run')
@@ -0,0 +1,47 @@
+"""add category path
+
+Revision ID: 576fe0c54ef0
+Revises: a26cb1192688
+Create Date: 2026-10-18 19:31:48.220961
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '576fe0c54ef0'
+down_revision = 'a26cb1192688'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('categories', sa.Column('path', sa.String(), nullable=True))
+    op.create_index(op.f('ix_categories_path'), 'categories', ['path'], unique=False)
+    # Backfill from parent_id; rows on a parent cycle have no root and keep a NULL path
+    conn = op.get_bind()
+    parents = dict(conn.execute(sa.text('SELECT id, parent_id FROM categories')).fetchall())
+    paths = {}
+    for start in parents:
+        chain = []
+        node = start
+        while node in parents and node not in paths and node not in chain:
+            chain.append(node)
+            node = parents[node]
+        if node in chain:
+            continue
+        # A missing parent (or none) makes the row a root, as the category tree does
+        prefix = paths.get(node, "/")
+        for node in reversed(chain):
+            prefix = paths[node] = f"{prefix}{node}/"
+    if paths:
+        conn.execute(
+            sa.text('UPDATE categories SET path = :path WHERE id = :id'),
+            [{"id": id, "path": path} for id, path in paths.items()],
+        )
+
+def downgrade():
+    op.drop_index(op.f('ix_categories_path'), table_name='categories')
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('path')
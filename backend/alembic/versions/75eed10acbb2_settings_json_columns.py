@@ -0,0 +1,89 @@
+"""settings json columns
+
+Revision ID: 75eed10acbb2
+Revises: 0dc1d14f20fd
+Create Date: 2026-10-18 17:48:03.512946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '75eed10acbb2'
+down_revision = '0dc1d14f20fd'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = ('languages', 'site_name', 'site_content', 'menu')
+
+
+def _parse(value, default):
+    if value is None or value == "":
+        return default
+    try:
+        return json.loads(value)
+    except ValueError:
+        return default
+
+
+def _parse_languages(value):
+    # Stored as "en,bg" by the settings API, but some rows hold a JSON list
+    if value and value.strip().startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    languages = [l.strip() for l in (value or "").split(",") if l.strip()]
+    return languages or ["en"]
+
+
+def _legacy_to_json(row):
+    """Convert one settings row from the text encodings to JSON documents."""
+    site_name = row.site_name
+    try:
+        site_name = json.loads(site_name)
+    except (TypeError, ValueError):
+        site_name = {"en": site_name} if site_name else {"en": "Global Virtual Display"}
+    site_content = row.site_content
+    try:
+        site_content = json.loads(site_content) if site_content else {}
+    except ValueError:
+        site_content = {"en": site_content}
+    return {
+        "languages": _parse_languages(row.languages),
+        "site_name": site_name,
+        "site_content": site_content,
+        "menu": _parse(row.menu, []),
+    }
+
+
+def upgrade():
+    conn = op.get_bind()
+    # Rewrite every value as valid JSON text first so the type change can cast it
+    rows = conn.execute(sa.text('SELECT id, languages, site_name, site_content, menu FROM settings')).fetchall()
+    for row in rows:
+        values = {k: json.dumps(v) for k, v in _legacy_to_json(row).items()}
+        conn.execute(
+            sa.text('UPDATE settings SET languages = :languages, site_name = :site_name, '
+                    'site_content = :site_content, menu = :menu WHERE id = :id'),
+            {**values, "id": row.id},
+        )
+    with op.batch_alter_table('settings') as batch_op:
+        for column in JSON_COLUMNS:
+            batch_op.alter_column(column, type_=sa.JSON(), postgresql_using=f'{column}::json')
+
+
+def downgrade():
+    with op.batch_alter_table('settings') as batch_op:
+        batch_op.alter_column('languages', type_=sa.String())
+        for column in ('site_name', 'site_content', 'menu'):
+            batch_op.alter_column(column, type_=sa.Text())
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, languages FROM settings')).fetchall()
+    for row in rows:
+        conn.execute(
+            sa.text('UPDATE settings SET languages = :languages WHERE id = :id'),
+            {"languages": ",".join(_parse(row.languages, ["en"])), "id": row.id},
+        )
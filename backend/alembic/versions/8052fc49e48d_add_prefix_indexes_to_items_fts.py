@@ -0,0 +1,46 @@
+"""add prefix indexes to items_fts
+
+Revision ID: 8052fc49e48d
+Revises: b5a623c0a35d
+Create Date: 2026-10-19 10:12:37.540281
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8052fc49e48d'
+down_revision = 'b5a623c0a35d'
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(options):
+    # FTS5 options are fixed at creation, so recreate and refill the table
+    op.execute("DROP TABLE IF EXISTS items_fts")
+    op.execute(
+        "CREATE VIRTUAL TABLE items_fts "
+        f"USING fts5(name, description, categories, tokenize = 'unicode61 remove_diacritics 2'{options})"
+    )
+    op.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0)')")
+    op.execute(
+        "INSERT INTO items_fts (rowid, name, description, categories) "
+        "SELECT items.id, coalesce(items.name, ''), coalesce(items.description, ''), coalesce(("
+        "  SELECT group_concat(categories.name, ' ') FROM item_categories"
+        "  JOIN categories ON categories.id = item_categories.category_id"
+        "  WHERE item_categories.item_id = items.id"
+        "), '') FROM items"
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(", prefix = '2 3 4'")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild("")
@@ -0,0 +1,24 @@
+"""index item_categories category_id
+
+Revision ID: a26cb1192688
+Revises: a7482611f780
+Create Date: 2026-10-18 18:52:10.517204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a26cb1192688'
+down_revision = 'a7482611f780'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_item_categories_category_id', 'item_categories', ['category_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_item_categories_category_id', table_name='item_categories')
@@ -0,0 +1,26 @@
+"""index widgets type and enabled
+
+Revision ID: a7482611f780
+Revises: 75eed10acbb2
+Create Date: 2026-10-18 18:21:37.409115
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7482611f780'
+down_revision = '75eed10acbb2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_widgets_type'), 'widgets', ['type'], unique=False)
+    op.create_index(op.f('ix_widgets_enabled'), 'widgets', ['enabled'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_widgets_enabled'), table_name='widgets')
+    op.drop_index(op.f('ix_widgets_type'), table_name='widgets')
@@ -0,0 +1,29 @@
+"""rank items_fts with bm25 weights
+
+Revision ID: b5a623c0a35d
+Revises: f8928154228f
+Create Date: 2026-10-18 23:05:42.118364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5a623c0a35d'
+down_revision = 'f8928154228f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # Persisted in items_fts_config; ORDER BY rank then scores with these column weights
+    op.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0)')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('rank', 'bm25()')")
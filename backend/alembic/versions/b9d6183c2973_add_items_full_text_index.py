@@ -0,0 +1,40 @@
+"""add items full-text index
+
+Revision ID: b9d6183c2973
+Revises: 576fe0c54ef0
+Create Date: 2026-10-18 20:07:51.903416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d6183c2973'
+down_revision = '576fe0c54ef0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other databases search with LIKE and need no index
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts "
+        "USING fts5(name, description, categories, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "INSERT INTO items_fts (rowid, name, description, categories) "
+        "SELECT items.id, coalesce(items.name, ''), coalesce(items.description, ''), coalesce(("
+        "  SELECT group_concat(categories.name, ' ') FROM item_categories"
+        "  JOIN categories ON categories.id = item_categories.category_id"
+        "  WHERE item_categories.item_id = items.id"
+        "), '') FROM items"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS items_fts")
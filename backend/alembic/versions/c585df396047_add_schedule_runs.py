@@ -0,0 +1,42 @@
+"""add schedule_runs
+
+Revision ID: c585df396047
+Revises: 4531a66bb22b
+Create Date: 2026-10-18 17:02:41.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c585df396047'
+down_revision = '4531a66bb22b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('schedule_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('schedule_id', sa.Integer(), nullable=False),
+    sa.Column('widget_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('scheduled_for', sa.DateTime(), nullable=True),
+    sa.Column('queued_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_schedule_runs_id'), 'schedule_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_schedule_runs_schedule_id'), 'schedule_runs', ['schedule_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_schedule_runs_schedule_id'), table_name='schedule_runs')
+    op.drop_index(op.f('ix_schedule_runs_id'), table_name='schedule_runs')
+    op.drop_table('schedule_runs')
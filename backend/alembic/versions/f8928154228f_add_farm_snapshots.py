@@ -0,0 +1,29 @@
+"""add farm_snapshots
+
+Revision ID: f8928154228f
+Revises: b9d6183c2973
+Create Date: 2026-10-18 22:41:16.274903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8928154228f'
+down_revision = 'b9d6183c2973'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('farm_snapshots',
+    sa.Column('farm_id', sa.String(), nullable=False),
+    sa.Column('response', sa.JSON(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('farm_id')
+    )
+
+
+def downgrade():
+    op.drop_table('farm_snapshots')
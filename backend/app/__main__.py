@@ -0,0 +1,10 @@
+# Run the backend with `python -m app`. Kept out of app/main.py: processes the
+# password hashing pool spawns re-import a plain __main__ module, which would
+# rebuild the whole app in each of them, but skip a package's __main__.
+import os
+import uvicorn
+
+if __name__ == "__main__":
+    host = os.environ.get("BACKEND_HOST", "0.0.0.0")
+    port = int(os.environ.get("BACKEND_PORT", "8887"))
+    uvicorn.run("app.main:app", host=host, port=port)
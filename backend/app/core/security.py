@@ -1,8 +1,27 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
+from app.utils.config import get_config
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor. Hashes with any other cost are upgraded on the next login.
+BCRYPT_ROUNDS = int(get_config("BCRYPT_ROUNDS", 12))
+# Processes doing bcrypt work, so a burst of logins cannot take over the
+# request threadpool or the event loop.
+PASSWORD_HASH_WORKERS = int(get_config("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
 SECRET_KEY = "your-secret-key"  # Change this to a secure value!
 ALGORITHM = "HS256"
@@ -14,6 +33,47 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Return (valid, new_hash); new_hash is set when the stored hash uses another cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+_password_pool = None
+_password_pool_lock = threading.Lock()
+
+def _init_password_worker():
+    # Ctrl+C reaches the whole process group; let the app shut the pool down instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _get_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            # spawn: forking a process that already runs threads is not safe.
+            # Workers only import this module (and the parent's __main__ when
+            # that is a plain script; see app/__main__.py).
+            _password_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_password_worker,
+            )
+        return _password_pool
+
+def shutdown_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown(cancel_futures=True)
+            _password_pool = None
+
+async def _run_in_password_pool(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_get_password_pool(), fn, *args)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_password_pool(get_password_hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    return await _run_in_password_pool(verify_and_update_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -9,7 +9,6 @@ from app.db.models.widget import Widget
 from app.db.models.schedule import Schedule
 from app.db.models.settings import Settings
 from passlib.context import CryptContext
-import json
 
 def seed_widgets(db):
     widgets = [
@@ -35,10 +34,10 @@ def seed_menu_and_settings(db):
     ]
     settings = db.query(Settings).first()
     if not settings:
-        settings = Settings(languages="en", site_name=json.dumps({"en": "Global Virtual Display"}), site_content=json.dumps({}), menu=json.dumps(menu))
+        settings = Settings(languages=["en"], site_name={"en": "Global Virtual Display"}, site_content={}, menu=menu)
         db.add(settings)
     else:
-        settings.menu = json.dumps(menu)
+        settings.menu = menu
     db.commit()
     print("Menu and settings seeded.")
 
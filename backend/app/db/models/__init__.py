@@ -4,4 +4,8 @@ from app.db.models.category import Category
 from app.db.models.widget import Widget
 from app.db.models.schedule import Schedule
 from app.db.models.settings import Settings
-__all__ = ["User", "Item", "Category", "Widget", "Schedule", "Settings"]
\ No newline at end of file
+from app.db.models.schedule_run import ScheduleRun
+from app.db.models.scheduler_lease import SchedulerLease
+from app.db.models.table_version import TableVersion
+from app.db.models.farm_snapshot import FarmSnapshot
+__all__ = ["User", "Item", "Category", "Widget", "Schedule", "Settings", "ScheduleRun", "SchedulerLease", "TableVersion", "FarmSnapshot"]
\ No newline at end of file
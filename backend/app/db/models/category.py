@@ -9,5 +9,7 @@ class Category(Base):
     parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
     selectable = Column(Boolean, default=True, nullable=False)
     order = Column(Integer, default=0, nullable=False)
+    # Materialized path of ids from the root, e.g. "/1/5/12/"; a subtree is a prefix range
+    path = Column(String, index=True, nullable=True)
     parent = relationship('Category', remote_side=[id], backref='children', uselist=False)
     items = relationship("Item", secondary="item_categories", back_populates="categories")
\ No newline at end of file
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from app.db.base import Base
+
+class FarmSnapshot(Base):
+    """Last HiveOS workers response per farm, written by the process holding the poller lease."""
+    __tablename__ = "farm_snapshots"
+    farm_id = Column(String, primary_key=True)
+    response = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime, nullable=False)  # naive UTC
@@ -1,11 +1,13 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 item_categories = Table(
     'item_categories', Base.metadata,
     Column('item_id', Integer, ForeignKey('items.id'), primary_key=True),
-    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True)
+    Column('category_id', Integer, ForeignKey('categories.id'), primary_key=True),
+    # The primary key leads with item_id; filtering items by category needs its own index
+    Index('ix_item_categories_category_id', 'category_id'),
 )
 
 class Item(Base):
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from app.db.base import Base
+from app.utils import recurrence
 
 class Schedule(Base):
     __tablename__ = "schedules"
@@ -8,10 +9,15 @@ class Schedule(Base):
     widget_id = Column(Integer, ForeignKey("widgets.id"), nullable=False)
     action = Column(String, nullable=False)
     time = Column(String, nullable=False)  # ISO string
-    repeat = Column(String, nullable=True)
+    repeat = Column(String, nullable=True)  # 'once', 'daily', 'weekly' or a cron expression
+    next_run = Column(DateTime, nullable=True, index=True)  # naive UTC; NULL once it will not fire again
 
     widget = relationship("Widget", back_populates="schedules")
 
+    def reschedule(self, after=None):
+        """Recompute next_run from time/repeat; raises ValueError on bad input."""
+        self.next_run = recurrence.next_run(self.time, self.repeat, after=after)
+
     def trigger(self, db):
         from app.db.models.widget import Widget
         widget = db.query(Widget).get(self.widget_id)
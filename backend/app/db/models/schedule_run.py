@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.db.base import Base
+
+class ScheduleRun(Base):
+    """Execution log entry for one fire of a schedule."""
+    __tablename__ = "schedule_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    # No foreign keys: the log outlives deleted schedules and widgets
+    schedule_id = Column(Integer, nullable=False, index=True)
+    widget_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued, running, ok, error, abandoned
+    owner = Column(String, nullable=True)  # WORKER_ID of the process that queued it
+    attempts = Column(Integer, nullable=False, default=0)
+    scheduled_for = Column(DateTime, nullable=True)
+    queued_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
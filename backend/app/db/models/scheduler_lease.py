@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.base import Base
+
+class SchedulerLease(Base):
+    """Time-limited ownership of a singleton background job across processes."""
+    __tablename__ = "scheduler_leases"
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # naive UTC
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base import Base
+
+class TableVersion(Base):
+    """Change counter per table, bumped in the same transaction as every write to it."""
+    __tablename__ = "table_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
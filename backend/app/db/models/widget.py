@@ -5,15 +5,18 @@ from app.db.base import Base
 class Widget(Base):
     __tablename__ = "widgets"
     id = Column(Integer, primary_key=True, index=True)
-    type = Column(String, nullable=False)
-    enabled = Column(Boolean, default=True)
+    type = Column(String, nullable=False, index=True)
+    enabled = Column(Boolean, default=True, index=True)
     config = Column(JSON, default={})
     size = Column(JSON, default={})
     pos = Column(JSON, default={})
     background = Column(String, nullable=True)
     name = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every write
     schedules = relationship("Schedule", back_populates="widget", cascade="all, delete-orphan")
 
+    __mapper_args__ = {"version_id_col": version}
+
     def run_action(self, action: str, config: dict = None, db=None):
         updated = False
         if action == "enable":
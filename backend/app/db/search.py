@@ -0,0 +1,172 @@
+"""Full-text search over items, kept in the items_fts FTS5 table on SQLite.
+
+Each index row holds an item's name, description and category names under
+the item's id as rowid. ORM flushes that create, change or delete items, or
+rename or delete categories, reindex the affected items inside the same
+transaction; bulk Core writes must call reindex_items() themselves. Other
+databases have no index and fall back to a LIKE scan.
+
+The table is created by its migration, and alongside items by create_all().
+
+bm25 reads the hits of every match to weigh each word, so ranking costs time
+in proportion to the match count. Queries with at most SEARCH_CANDIDATES
+matches are ranked; more common ones list, newest first, the items with the
+whole words in the name (the heaviest-weighted column), then elsewhere, then
+the items matching only through the prefix of the last word.
+"""
+import re
+from sqlalchemy import DDL, bindparam, event, inspect, text
+from sqlalchemy.orm import Session
+from app.db.models.item import Item
+from app.utils.config import get_config
+
+# Rowids per statement, well below SQLite's bound-parameter limit
+BATCH_SIZE = 500
+# bm25 column weights: name, description, category names. Stored as the
+# table's rank function so ORDER BY rank scores inside FTS5.
+RANK = "bm25(10.0, 1.0, 4.0)"
+# Most matches a query can have and still be ranked by bm25
+SEARCH_CANDIDATES = int(get_config("SEARCH_CANDIDATES", 1000))
+
+_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts "
+    "USING fts5(name, description, categories, "
+    # Prefix indexes for the first letters typed, which expand to the most terms
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+_SET_RANK = f"INSERT INTO items_fts (items_fts, rank) VALUES ('rank', '{RANK}')"
+_DELETE = text("DELETE FROM items_fts WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True))
+_INDEX_ROWS = (
+    "INSERT INTO items_fts (rowid, name, description, categories) "
+    "SELECT items.id, coalesce(items.name, ''), coalesce(items.description, ''), coalesce(("
+    "  SELECT group_concat(categories.name, ' ') FROM item_categories"
+    "  JOIN categories ON categories.id = item_categories.category_id"
+    "  WHERE item_categories.item_id = items.id"
+    "), '') FROM items"
+)
+_INSERT = text(_INDEX_ROWS + " WHERE items.id IN :ids").bindparams(bindparam("ids", expanding=True))
+_CATEGORY_ITEMS = text(
+    "SELECT DISTINCT item_id FROM item_categories WHERE category_id IN :ids"
+).bindparams(bindparam("ids", expanding=True))
+_COUNT = text("SELECT count(*) FROM (SELECT rowid FROM items_fts WHERE items_fts MATCH :query LIMIT :most)")
+_RANKED = text("SELECT rowid FROM items_fts WHERE items_fts MATCH :query ORDER BY rank LIMIT :limit OFFSET :offset")
+_NEWEST = text("SELECT rowid FROM items_fts WHERE items_fts MATCH :query ORDER BY rowid DESC LIMIT :limit OFFSET :offset")
+_LIKE = text(
+    "SELECT id FROM items WHERE name LIKE :pattern OR description LIKE :pattern "
+    "ORDER BY id LIMIT :limit OFFSET :offset"
+)
+
+event.listen(Item.__table__, "after_create", DDL(_CREATE).execute_if(dialect="sqlite"))
+event.listen(Item.__table__, "after_create", DDL(_SET_RANK).execute_if(dialect="sqlite"))
+event.listen(Item.__table__, "before_drop", DDL("DROP TABLE IF EXISTS items_fts").execute_if(dialect="sqlite"))
+
+def uses_fts(bind):
+    return bind.dialect.name == "sqlite"
+
+def _batches(ids):
+    ids = sorted(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+def remove_items(connection, ids):
+    for batch in _batches(ids):
+        connection.execute(_DELETE, {"ids": batch})
+
+def reindex_items(connection, ids):
+    """Rebuild the index rows of the given items from their current rows; gone items are dropped."""
+    for batch in _batches(ids):
+        connection.execute(_DELETE, {"ids": batch})
+        connection.execute(_INSERT, {"ids": batch})
+
+def rebuild_search_index(connection):
+    """Reindex every item, e.g. after bulk loads that bypassed the ORM."""
+    connection.execute(text("DELETE FROM items_fts"))
+    connection.execute(text(_INDEX_ROWS))
+
+def fts_query(q, prefix=True):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Only word characters are kept, so user input can never inject FTS syntax.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + ("*" if prefix else "")
+
+def _count(db, query, most):
+    return db.execute(_COUNT, {"query": query, "most": most}).scalar()
+
+def _newest(db, query, limit, offset):
+    return db.execute(_NEWEST, {"query": query, "limit": limit, "offset": offset}).scalars().all()
+
+def _newest_in_order(db, queries, limit, offset):
+    """Page through the matches of each query in turn, newest first within each."""
+    ids = []
+    for query in queries:
+        if offset:
+            skipped = _count(db, query, offset)
+            if skipped < offset:
+                offset -= skipped
+                continue
+        ids += _newest(db, query, limit - len(ids), offset)
+        offset = 0
+        if len(ids) == limit:
+            break
+    return ids
+
+def search_item_ids(db, q, limit, offset=0):
+    """Ids of the items matching q, best match first, and whether they were ranked by relevance."""
+    if uses_fts(db.get_bind()):
+        query, words = fts_query(q), fts_query(q, prefix=False)
+        if query is None:
+            return [], True
+        most = SEARCH_CANDIDATES + 1
+        # Probe the whole words first: cheap, while a long prefix builds its full match list
+        if _count(db, words, most) < most and _count(db, query, most) < most:
+            ids = db.execute(_RANKED, {"query": query, "limit": limit, "offset": offset}).scalars().all()
+            return ids, True
+        # Too many matches to rank: whole words in the name, whole words elsewhere, then prefix-only matches
+        in_name = f"name : ({words})"
+        queries = [in_name, f"({words}) NOT {in_name}", f"({query}) NOT ({words})"]
+        return _newest_in_order(db, queries, limit, offset), False
+    pattern = "%" + q.replace("\\", "").replace("%", "").replace("_", "") + "%"
+    return db.execute(_LIKE, {"pattern": pattern, "limit": limit, "offset": offset}).scalars().all(), True
+
+def _table_name(obj):
+    table = getattr(obj, "__table__", None)
+    return table.name if table is not None else None
+
+@event.listens_for(Session, "before_flush")
+def _collect_deleted_category_items(session, flush_context, instances):
+    # The association rows are gone after the flush, so look up the items now
+    deleted = [obj.id for obj in session.deleted if _table_name(obj) == "categories"]
+    if deleted and uses_fts(session.get_bind()):
+        item_ids = session.execute(_CATEGORY_ITEMS, {"ids": deleted}).scalars().all()
+        session.info.setdefault("search_reindex", set()).update(item_ids)
+
+@event.listens_for(Session, "after_flush")
+def _sync_search_index(session, flush_context):
+    if not uses_fts(session.get_bind()):
+        return
+    reindex = session.info.pop("search_reindex", set())
+    removed = set()
+    renamed = []
+    for obj in session.new:
+        if _table_name(obj) == "items":
+            reindex.add(obj.id)
+    for obj in session.dirty:
+        name = _table_name(obj)
+        if name == "items" and session.is_modified(obj):
+            reindex.add(obj.id)
+        elif name == "categories" and inspect(obj).attrs.name.history.has_changes():
+            renamed.append(obj.id)
+    for obj in session.deleted:
+        if _table_name(obj) == "items":
+            removed.add(obj.id)
+    if renamed:
+        reindex.update(session.execute(_CATEGORY_ITEMS, {"ids": renamed}).scalars().all())
+    connection = session.connection()
+    if removed:
+        remove_items(connection, removed)
+    if reindex - removed:
+        reindex_items(connection, reindex - removed)
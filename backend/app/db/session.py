@@ -1,13 +1,82 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from app.utils.config import get_config
+import app.db.versioning  # registers the table change counters on every Session
+import app.db.search  # keeps the items full-text index in sync on every Session
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"  # Or your DB URL
+SQLALCHEMY_DATABASE_URL = get_config("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Applied to every new SQLite connection. WAL lets readers run alongside the
+# writer, busy_timeout makes writers wait for the lock instead of failing with
+# "database is locked", and synchronous=NORMAL is durable under WAL except for
+# the last commits on power loss.
+SQLITE_PRAGMAS = {
+    "journal_mode": get_config("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": get_config("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(get_config("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "mmap_size": int(get_config("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "cache_size": int(get_config("SQLITE_CACHE_SIZE", -64000)),  # negative = KiB
+    "temp_store": get_config("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def make_engine(url=SQLALCHEMY_DATABASE_URL, **kwargs):
+    """Create an engine for `url`; SQLite gets the pragmas above and a persistent pool."""
+    pool_size = int(get_config("DB_POOL_SIZE", 10))
+    max_overflow = int(get_config("DB_MAX_OVERFLOW", 20))
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True, **kwargs)
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # A private in-memory database only exists on its one connection
+        kwargs.setdefault("poolclass", StaticPool)
+    else:
+        # Keep connections open so pragmas and the page cache survive between requests
+        kwargs.setdefault("poolclass", QueuePool)
+        kwargs.setdefault("pool_size", pool_size)
+        kwargs.setdefault("max_overflow", max_overflow)
+    engine = create_engine(url, connect_args={"check_same_thread": False}, **kwargs)
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+def async_url(url):
+    """Map a sync database URL onto its asyncio driver."""
+    for prefix, driver in (("sqlite:", "sqlite+aiosqlite:"), ("postgresql:", "postgresql+asyncpg:")):
+        if url.startswith(prefix):
+            return driver + url[len(prefix):]
+    return url
+
+def make_async_engine(url=None, **kwargs):
+    """Async counterpart of make_engine(), sharing its pool settings and SQLite pragmas."""
+    url = url or get_config("ASYNC_DATABASE_URL") or async_url(SQLALCHEMY_DATABASE_URL)
+    pool_size = int(get_config("DB_POOL_SIZE", 10))
+    max_overflow = int(get_config("DB_MAX_OVERFLOW", 20))
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True, **kwargs)
+    if url.endswith((":///:memory:", "://")):
+        kwargs.setdefault("poolclass", StaticPool)
+    else:
+        kwargs.setdefault("poolclass", AsyncAdaptedQueuePool)
+        kwargs.setdefault("pool_size", pool_size)
+        kwargs.setdefault("max_overflow", max_overflow)
+    engine = create_async_engine(url, **kwargs)
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = make_async_engine()
+AsyncSessionLocal = sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -15,5 +84,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Async session dependency for routes that should not occupy a threadpool slot."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # For Alembic compatibility, expose the database URL as a variable
-DB_URL = SQLALCHEMY_DATABASE_URL
\ No newline at end of file
+DB_URL = SQLALCHEMY_DATABASE_URL
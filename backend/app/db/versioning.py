@@ -0,0 +1,42 @@
+"""Per-table change counters kept in table_versions.
+
+Any ORM flush or bulk UPDATE/DELETE touching a tracked table bumps its
+counter inside the same transaction, so readers can tell whether a table
+changed with one primary-key lookup (e.g. to answer If-None-Match).
+"""
+from itertools import chain
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+TRACKED_TABLES = {"widgets", "settings", "categories", "items"}
+
+_BUMP = text(
+    "INSERT INTO table_versions (name, version) VALUES (:name, 1) "
+    "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1"
+)
+_READ = text("SELECT version FROM table_versions WHERE name = :name")
+
+def bump_table_version(connection, name):
+    connection.execute(_BUMP, {"name": name})
+
+def get_table_version(db, name):
+    """Current change counter for a table (0 if it was never written)."""
+    return db.execute(_READ, {"name": name}).scalar() or 0
+
+def _table_name(obj):
+    table = getattr(obj, "__table__", None)
+    return table.name if table is not None else None
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_tables(session, flush_context):
+    tables = {_table_name(obj) for obj in chain(session.new, session.deleted)}
+    tables.update(_table_name(obj) for obj in session.dirty if session.is_modified(obj))
+    for name in sorted(tables & TRACKED_TABLES):
+        bump_table_version(session.connection(), name)
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        name = orm_execute_state.statement.table.name
+        if name in TRACKED_TABLES:
+            bump_table_version(orm_execute_state.session.connection(), name)
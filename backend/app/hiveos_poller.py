@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import uuid
+from datetime import timedelta
+from app.db.session import SessionLocal
+from app.db.models.widget import Widget
+from app.db.models.farm_snapshot import FarmSnapshot
+from app.schedule_worker import WORKER_ID, acquire_lease, release_lease
+from app.utils.config import get_config
+from app.utils.http import safe_get
+from app.utils.logger import get_logger
+from app.utils.recurrence import utcnow
+
+logger = get_logger("hiveos_poller")
+
+POLL_INTERVAL = float(get_config("HIVEOS_POLL_INTERVAL", 15))
+# Only the process holding this lease calls HiveOS. It stores every response in
+# farm_snapshots and the other processes publish those to their own streams, so
+# upstream traffic does not grow with the number of worker processes.
+LEASE_NAME = "hiveos_poller"
+LEASE_TTL = timedelta(seconds=float(get_config("HIVEOS_LEASE_TTL", 3 * POLL_INTERVAL)))
+
+def _token_hash(token):
+    return hashlib.sha256((token or "").encode()).hexdigest()
+
+def _worker_id(worker):
+    return str(worker.get("id") or worker.get("worker_id"))
+
+def diff_workers(old, new):
+    """Compare two {worker_id: worker} maps and return added/changed/removed."""
+    return {
+        "added": [w for wid, w in new.items() if wid not in old],
+        "changed": [w for wid, w in new.items() if wid in old and old[wid] != w],
+        "removed": [wid for wid in old if wid not in new],
+    }
+
+class FarmHub:
+    """Versioned worker snapshots per farm plus the queues of clients streaming them.
+
+    Every published change bumps the farm version and stamps the touched
+    workers, so delta() can answer "what changed since version N" without
+    keeping old snapshots around. Clients see versions as "<epoch>:<n>"
+    tokens; the epoch is unique to this hub, so a token issued by another
+    worker process or before a restart always gets a full snapshot.
+    """
+
+    def __init__(self, queue_size=16, max_tombstones=1024):
+        self.epoch = uuid.uuid4().hex
+        self.queue_size = queue_size
+        self.max_tombstones = max_tombstones
+        self.workers = {}      # farm_id -> {worker_id: worker}
+        self.versions = {}     # farm_id -> current version
+        self.horizon = {}      # farm_id -> oldest version delta() can answer from
+        self.added_at = {}     # farm_id -> {worker_id: version}
+        self.changed_at = {}   # farm_id -> {worker_id: version}
+        self.removed_at = {}   # farm_id -> {worker_id: version}
+        self.tokens = {}       # farm_id -> {token_hash: token}
+        self.subscribers = {}  # farm_id -> set of asyncio.Queue
+
+    def track(self, farms):
+        """Set the polled farms ({farm_id: {token_hash: token}}) and forget every other farm."""
+        self.tokens = farms
+        for farm_id in [f for f in self.workers if f not in farms]:
+            for state in (self.workers, self.versions, self.horizon, self.added_at, self.changed_at, self.removed_at):
+                state.pop(farm_id, None)
+
+    def authorized(self, farm_id, token):
+        return _token_hash(token) in self.tokens.get(str(farm_id), {})
+
+    def version_token(self, farm_id):
+        version = self.versions.get(str(farm_id))
+        return None if version is None else f"{self.epoch}:{version}"
+
+    def _parse_token(self, token):
+        """Return the version a token of this hub names, or None for foreign or malformed tokens."""
+        epoch, _, version = str(token).partition(":")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def snapshot_event(self, farm_id):
+        farm_id = str(farm_id)
+        return {
+            "type": "snapshot",
+            "version": self.version_token(farm_id),
+            "rigs": list(self.workers.get(farm_id, {}).values()),
+        }
+
+    def delta(self, farm_id, since=None):
+        """Return workers changed since a version token, a full snapshot, or None if unchanged."""
+        farm_id = str(farm_id)
+        version = self.versions.get(farm_id)
+        if version is None:
+            return self.snapshot_event(farm_id)
+        since = None if since is None else self._parse_token(since)
+        if since == version:
+            return None
+        if since is None or since < self.horizon[farm_id] or since > version:
+            return self.snapshot_event(farm_id)
+        workers = self.workers[farm_id]
+        added_at, changed_at = self.added_at[farm_id], self.changed_at[farm_id]
+        touched = [wid for wid, v in changed_at.items() if v > since]
+        return {
+            "type": "diff",
+            "version": self.version_token(farm_id),
+            "added": [workers[wid] for wid in touched if added_at[wid] > since],
+            "changed": [workers[wid] for wid in touched if added_at[wid] <= since],
+            "removed": [wid for wid, v in self.removed_at[farm_id].items() if v > since],
+        }
+
+    def subscribe(self, farm_id):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(str(farm_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, farm_id, queue):
+        queues = self.subscribers.get(str(farm_id))
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[str(farm_id)]
+
+    def _record(self, farm_id, new):
+        old = self.workers.get(farm_id)
+        if old is None:
+            version = 1
+            self.horizon[farm_id] = version
+            self.added_at[farm_id] = dict.fromkeys(new, version)
+            self.changed_at[farm_id] = dict.fromkeys(new, version)
+            self.removed_at[farm_id] = {}
+            self.workers[farm_id] = new
+            self.versions[farm_id] = version
+            return None
+        diff = diff_workers(old, new)
+        if not (diff["added"] or diff["changed"] or diff["removed"]):
+            return diff
+        version = self.versions[farm_id] + 1
+        added_at, changed_at = self.added_at[farm_id], self.changed_at[farm_id]
+        removed_at = self.removed_at[farm_id]
+        for worker in diff["added"]:
+            wid = _worker_id(worker)
+            added_at[wid] = changed_at[wid] = version
+            removed_at.pop(wid, None)
+        for worker in diff["changed"]:
+            changed_at[_worker_id(worker)] = version
+        for wid in diff["removed"]:
+            del added_at[wid], changed_at[wid]
+            removed_at[wid] = version
+        if len(removed_at) > self.max_tombstones:
+            # Forget the oldest removals; clients older than that get a full snapshot
+            for wid, v in sorted(removed_at.items(), key=lambda item: item[1])[:len(removed_at) - self.max_tombstones]:
+                del removed_at[wid]
+                self.horizon[farm_id] = max(self.horizon[farm_id], v)
+        self.workers[farm_id] = new
+        self.versions[farm_id] = version
+        return diff
+
+    def publish(self, farm_id, rigs):
+        """Store the latest worker list, push any diff to subscribers and return the version token.
+
+        Only polled farms are kept, so requests for arbitrary farm ids cannot
+        grow the hub; for any other farm this does nothing and returns None.
+        """
+        farm_id = str(farm_id)
+        if farm_id not in self.tokens:
+            return None
+        diff = self._record(farm_id, {_worker_id(w): w for w in rigs})
+        version = self.version_token(farm_id)
+        if diff is None:
+            event = self.snapshot_event(farm_id)
+        elif diff["added"] or diff["changed"] or diff["removed"]:
+            event = {"type": "diff", "version": version, **diff}
+        else:
+            return version
+        for queue in self.subscribers.get(farm_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client missed diffs; replace its backlog with a full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_event(farm_id))
+        return version
+
+hub = FarmHub()
+
+def configured_farms():
+    """Return {farm_id: {token_hash: token}} for every hive widget and the env config."""
+    farms = {}
+    env_token, env_farm = get_config("HIVE_TOKEN"), get_config("HIVE_FARM_ID")
+    if env_token and env_farm:
+        farms.setdefault(str(env_farm), {})[_token_hash(env_token)] = env_token
+    with SessionLocal() as db:
+        for widget in db.query(Widget).filter(Widget.type == "hive").all():
+            config = widget.config or {}
+            token, farm_id = config.get("token"), config.get("farmId")
+            if token and farm_id:
+                farms.setdefault(str(farm_id), {})[_token_hash(token)] = token
+    return farms
+
+def _begin_iteration():
+    """Reload the polled farms and take or renew the lease; returns (farms, is_leader)."""
+    farms = configured_farms()
+    with SessionLocal() as db:
+        return farms, acquire_lease(db, utcnow(), LEASE_NAME, LEASE_TTL)
+
+def save_snapshots(farm_ids, responses):
+    """Store the leader's responses and drop snapshots of farms no longer polled."""
+    with SessionLocal() as db:
+        now = utcnow()
+        for farm_id, response in responses.items():
+            db.merge(FarmSnapshot(farm_id=farm_id, response=response, fetched_at=now))
+        db.query(FarmSnapshot).filter(FarmSnapshot.farm_id.notin_(list(farm_ids))).delete(synchronize_session=False)
+        db.commit()
+
+def load_snapshots(farm_ids):
+    """Return {farm_id: response} for the farms the leader has polled."""
+    with SessionLocal() as db:
+        rows = db.query(FarmSnapshot).filter(FarmSnapshot.farm_id.in_(list(farm_ids))).all()
+        return {row.farm_id: row.response for row in rows}
+
+def _release():
+    with SessionLocal() as db:
+        release_lease(db, LEASE_NAME)
+
+def publish_response(farm_id, tokens, result):
+    from app.routes.hiveos import read_cache, _cache_key
+    # Prime the read cache so POST /farm calls are served without an upstream hit
+    for t in tokens.values():
+        read_cache.set(_cache_key(t, farm_id), result)
+    hub.publish(farm_id, result["data"])
+
+async def poll_farm(farm_id, tokens):
+    """Fetch a farm from HiveOS and publish it; returns the response, or None on failure."""
+    from app.routes.hiveos import HIVEOS_API_BASE
+    token = next(iter(tokens.values()))
+    url = f"{HIVEOS_API_BASE}/farms/{farm_id}/workers"
+    result = await safe_get(url, headers={"Authorization": f"Bearer {token}"})
+    if not result or "data" not in result:
+        logger.warning(f"HiveOS poll failed for farm {farm_id}: {result}")
+        return None
+    publish_response(farm_id, tokens, result)
+    return result
+
+async def hiveos_poller():
+    leader = False
+    try:
+        while True:
+            try:
+                farms, is_leader = await asyncio.to_thread(_begin_iteration)
+                if is_leader != leader:
+                    logger.info(f"HiveOS poller {WORKER_ID} {'acquired' if is_leader else 'lost'} the poller lease")
+                    leader = is_leader
+                hub.track(farms)
+                if leader:
+                    results = await asyncio.gather(*(poll_farm(farm_id, tokens) for farm_id, tokens in farms.items()))
+                    responses = {farm_id: result for farm_id, result in zip(farms, results) if result}
+                    await asyncio.to_thread(save_snapshots, farms, responses)
+                else:
+                    responses = await asyncio.to_thread(load_snapshots, farms)
+                    for farm_id, result in responses.items():
+                        publish_response(farm_id, farms[farm_id], result)
+            except Exception as e:
+                logger.warning(f"HiveOS poller iteration failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+    finally:
+        if leader:
+            await asyncio.to_thread(_release)
@@ -0,0 +1,218 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import sessionmaker
+from app.db.session import engine
+from app.db.models.schedule import Schedule
+from app.db.models.schedule_run import ScheduleRun
+from app.utils.config import get_config
+from app.utils.logger import get_logger
+from app.utils.recurrence import utcnow
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = get_logger("job_queue")
+
+# Identifies this process as a lease holder and as the owner of the runs it queues
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+HIVEOS_ACTIONS = ('miners/start', 'miners/stop', 'shutdown', 'reboot')
+WIDGET_ACTIONS = ('enable', 'disable')
+
+def supported_actions(widget_type):
+    """Actions a schedule can run on a widget of this type."""
+    if widget_type == "hive":
+        return WIDGET_ACTIONS + HIVEOS_ACTIONS
+    return WIDGET_ACTIONS
+
+# Scheduler and job bookkeeping run their blocking SQLAlchemy work here so a
+# slow query or a locked database never stalls the event loop.
+db_executor = ThreadPoolExecutor(
+    max_workers=int(get_config("SCHEDULE_DB_THREADS", 2)), thread_name_prefix="schedule-db"
+)
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking DB callable on the scheduler's thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, lambda: fn(*args, **kwargs))
+
+class JobFailed(Exception):
+    def __init__(self, message, retry=True):
+        super().__init__(message)
+        self.retry = retry
+
+class ScheduledJob:
+    """One fire of a schedule. run() is retried by the queue until it stops raising."""
+
+    def __init__(self, sched, scheduled_for=None):
+        self.schedule_id = sched.id
+        self.widget_id = sched.widget_id
+        self.action = sched.action
+        self.scheduled_for = scheduled_for
+        self.run_id = None
+
+    async def run(self):
+        if self.action not in WIDGET_ACTIONS:
+            raise JobFailed(f"unsupported action: {self.action}", retry=False)
+        await run_db(self._trigger)
+
+    def _trigger(self):
+        with SessionLocal() as db:
+            sched = db.query(Schedule).get(self.schedule_id)
+            if sched is None:
+                raise JobFailed("schedule no longer exists", retry=False)
+            sched.trigger(db)
+
+class HiveOSJob(ScheduledJob):
+    """Sends a HiveOS command for a hive widget; retries only the workers that failed."""
+
+    def __init__(self, sched, scheduled_for=None):
+        super().__init__(sched, scheduled_for)
+        config = sched.widget.config or {}
+        self.token = config.get("token")
+        self.farm_id = config.get("farmId")
+        worker_id = config.get("workerId") if config.get("mode") != "farm" else None
+        self.worker_ids = [worker_id] if worker_id else None
+
+    async def run(self):
+        from app.routes.hiveos import run_hiveos_action
+        if not self.farm_id:
+            raise JobFailed("hive widget has no farmId configured", retry=False)
+        results = await run_hiveos_action(self.token, self.farm_id, self.action, self.worker_ids)
+        failed = [r for r in results if r["status"] != "ok"]
+        if failed:
+            retryable = [r["worker_id"] for r in failed if r["worker_id"] is not None]
+            if retryable:
+                self.worker_ids = retryable
+            raise JobFailed(
+                f"{len(failed)} of {len(results)} worker(s) failed: "
+                + ", ".join(f"{r['worker_id']} ({r['error']})" for r in failed),
+                retry=bool(retryable),
+            )
+
+def make_job(sched, scheduled_for=None):
+    widget = sched.widget
+    if widget is not None and widget.type == "hive" and sched.action in HIVEOS_ACTIONS:
+        return HiveOSJob(sched, scheduled_for)
+    return ScheduledJob(sched, scheduled_for)
+
+def _update_run(run_id, **fields):
+    with SessionLocal() as db:
+        db.query(ScheduleRun).filter(ScheduleRun.id == run_id).update(fields)
+        db.commit()
+
+def abandon_orphaned_runs(db, now):
+    """Close out runs another process queued but never finished.
+
+    Jobs live only in the owning process's memory, so once that process dies
+    or loses the dispatcher lease its queued/running rows would never move on.
+    They are marked abandoned rather than re-run: HiveOS commands are not
+    idempotent and the schedule will fire again on its next occurrence.
+    Returns the number of rows updated.
+    """
+    count = (
+        db.query(ScheduleRun)
+        .filter(
+            ScheduleRun.status.in_(("queued", "running")),
+            (ScheduleRun.owner.is_(None)) | (ScheduleRun.owner != WORKER_ID),
+        )
+        .update(
+            {"status": "abandoned", "finished_at": now, "error": "worker stopped before the run finished"},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return count
+
+class JobQueue:
+    """Bounded pool of async workers running scheduled jobs with retry/backoff.
+
+    Every job gets a schedule_runs row that moves through queued, running
+    and ok/error, recording attempts, duration and the last error. Rows are
+    tagged with WORKER_ID so a new leader can abandon the ones it inherits.
+    """
+
+    def __init__(self, concurrency=4, retries=3, backoff=2.0):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = None
+        self._loop = None
+        self._workers = []
+
+    def start(self):
+        if self._workers:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, db, job):
+        """Log the job as queued using the caller's session and hand it to the workers.
+
+        Safe to call from the DB thread pool: the enqueue is marshalled onto the loop.
+        """
+        run = ScheduleRun(
+            schedule_id=job.schedule_id,
+            widget_id=job.widget_id,
+            action=job.action,
+            status="queued",
+            owner=WORKER_ID,
+            scheduled_for=job.scheduled_for,
+            queued_at=utcnow(),
+        )
+        db.add(run)
+        db.commit()
+        job.run_id = run.id
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._execute(job)
+            except Exception as e:
+                logger.warning(f"Job for schedule {job.schedule_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job):
+        await run_db(_update_run, job.run_id, status="running", started_at=utcnow())
+        started = time.monotonic()
+        error = None
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await job.run()
+                error = None
+                break
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                logger.warning(f"Schedule {job.schedule_id} ({job.action}) attempt {attempt} failed: {error}")
+                if attempt > self.retries or not getattr(e, "retry", True):
+                    break
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+        await run_db(
+            _update_run,
+            job.run_id,
+            status="error" if error else "ok",
+            attempts=attempt,
+            finished_at=utcnow(),
+            duration_ms=int((time.monotonic() - started) * 1000),
+            error=error,
+        )
+
+job_queue = JobQueue(
+    concurrency=int(get_config("SCHEDULE_JOB_CONCURRENCY", 8)),
+    retries=int(get_config("SCHEDULE_JOB_RETRIES", 3)),
+    backoff=float(get_config("SCHEDULE_JOB_BACKOFF", 2)),
+)
@@ -12,8 +12,15 @@ import importlib
 import os
 import asyncio
 from app.schedule_worker import schedule_worker
+from app.hiveos_poller import hiveos_poller
+from app.utils.http import init_http_client, close_http_client
+from app.utils.loop_monitor import LoopLagMonitor
+from app.utils.config import get_config
+from app.db.session import async_engine
+from app.core.security import shutdown_password_pool
 
 app = FastAPI()
+loop_monitor = LoopLagMonitor(interval=float(get_config("LOOP_LAG_INTERVAL", 0.1)))
 
 @app.on_event("startup")
 def on_startup():
@@ -23,6 +30,31 @@ def on_startup():
 async def start_schedule_worker():
     asyncio.create_task(schedule_worker())
 
+@app.on_event("startup")
+async def start_hiveos_poller():
+    asyncio.create_task(hiveos_poller())
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    asyncio.create_task(loop_monitor.run())
+
+@app.on_event("startup")
+async def start_http_client():
+    await init_http_client()
+
+@app.on_event("shutdown")
+async def stop_http_client():
+    await close_http_client()
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    shutdown_password_pool()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    # aiosqlite runs each connection on a non-daemon thread; close them or exit hangs
+    await async_engine.dispose()
+
 app.include_router(user_router)
 app.include_router(category_router)
 app.include_router(settings_router)
@@ -37,12 +69,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Next-Offset", "X-Search-Approximate"],
 )
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Fullstack App!"}
 
+@app.get("/api/v1/metrics/loop")
+async def loop_lag():
+    """Event loop lag over the recent window; spikes mean something is blocking the loop."""
+    return loop_monitor.stats()
+
 def load_widgets(app):
     widgets_dir = os.path.join(os.path.dirname(__file__), "widgets")
     if not os.path.exists(widgets_dir):
@@ -59,10 +97,3 @@ def load_widgets(app):
                 print(f"❌ Failed to load {widget}: {e}")
 
 load_widgets(app)
-
-if __name__ == "__main__":
-    import uvicorn
-    import os
-    host = os.environ.get("BACKEND_HOST", "0.0.0.0")
-    port = int(os.environ.get("BACKEND_PORT", "8887"))
-    uvicorn.run(app, host=host, port=port)
\ No newline at end of file
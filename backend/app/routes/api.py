@@ -1,22 +1,77 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.db.models.item import Item
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session, selectinload
+import csv
+import io
+import json
+from app.db.session import get_db, SessionLocal
+from app.db.models.item import Item, item_categories
 from app.db.models.category import Category  # Import Category model
+from app.db.models.users import User
 from app.schemas.catalogue.items import ItemCreate, ItemRead 
+from app.routes.category import category_tree_cache, subtree_filter
+from app.routes.deps import get_current_admin_user
+from app.db.search import search_item_ids, reindex_items, uses_fts
+from app.db.versioning import bump_table_version
+from app.utils.config import get_config
 
 router = APIRouter(
     prefix="/api/v1/items",  # Add a prefix for all routes in this router
     tags=["Items"]           # Group these routes in OpenAPI documentation
 )
 
+# Items inserted per transaction by the bulk import
+IMPORT_BATCH_SIZE = int(get_config("ITEM_IMPORT_BATCH_SIZE", 5000))
+# Items fetched per round trip while streaming an export
+EXPORT_BATCH_SIZE = int(get_config("ITEM_EXPORT_BATCH_SIZE", 1000))
+# Invalid import rows reported back in detail; the rest are only counted
+IMPORT_MAX_ERRORS = 100
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_FIELDS = ("id", "name", "description", "price", "category_ids")
+
 @router.get("/health", tags=["Health"]) # Keep health check separate or move to a general router
 async def health_check():
     return {"status": "healthy"}
 
 @router.get("/", response_model=list[ItemRead]) # Path becomes relative to the prefix
-def list_items(db: Session = Depends(get_db)):
-    items = db.query(Item).all()
+def list_items(
+    response: Response,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    category_id: Optional[int] = None,
+    category_subtree: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """List items ordered by id, one page at a time.
+
+    `after_id` is the last id of the previous page; when more items follow,
+    the X-Next-Cursor header holds the value to pass next. Categories are
+    loaded for the whole page in a single extra query. category_subtree
+    matches items in that category or any of its descendants.
+    """
+    query = db.query(Item).options(selectinload(Item.categories))
+    if category_id is not None:
+        query = query.filter(Item.id.in_(
+            select(item_categories.c.item_id).where(item_categories.c.category_id == category_id)
+        ))
+    if category_subtree is not None:
+        path = db.query(Category.path).filter(Category.id == category_subtree).scalar()
+        if path is None:
+            raise HTTPException(status_code=404, detail="Category not found")
+        query = query.filter(Item.id.in_(
+            select(item_categories.c.item_id)
+            .join(Category, Category.id == item_categories.c.category_id)
+            .where(*subtree_filter(path))
+        ))
+    if after_id is not None:
+        query = query.filter(Item.id > after_id)
+    items = query.order_by(Item.id).limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = str(items[-1].id)
     return [ItemRead.from_orm_with_categories(item) for item in items]
 
 @router.post("/", response_model=ItemRead) # Path becomes relative to the prefix
@@ -30,9 +85,202 @@ def create_item(item: ItemCreate, db: Session = Depends(get_db)):
         db_item.categories = db.query(Category).filter(Category.id.in_(item.category_ids)).all()
     db.add(db_item)
     db.commit()
+    category_tree_cache.invalidate()
     db.refresh(db_item)
     return ItemRead.from_orm_with_categories(db_item)
 
+@router.get("/search", response_model=list[ItemRead])
+def search_items(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+):
+    """Items whose name, description or category names match q, best match first.
+
+    Every word must match, the last one as a prefix. When more results
+    follow, the X-Next-Offset header holds the offset of the next page.
+    Queries too common to rank by relevance list name matches first, then
+    the rest, newest first, and say so with X-Search-Approximate: true.
+    """
+    ids, ranked = search_item_ids(db, q, limit + 1, offset)
+    if not ranked:
+        response.headers["X-Search-Approximate"] = "true"
+    if len(ids) > limit:
+        ids = ids[:limit]
+        response.headers["X-Next-Offset"] = str(offset + limit)
+    items = {item.id: item for item in db.query(Item).options(selectinload(Item.categories)).filter(Item.id.in_(ids))}
+    return [ItemRead.from_orm_with_categories(items[id]) for id in ids if id in items]
+
+def _import_format(format, filename):
+    if format is None:
+        extension = (filename or "").rsplit(".", 1)[-1].lower()
+        format = {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}.get(extension)
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Import format must be ndjson or csv")
+    return format
+
+def _row_error(e):
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+def _read_import_rows(text, format):
+    """Yield (line number, ItemCreate or error message) for each row of an import stream."""
+    if format == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            try:
+                category_ids = [int(id) for id in (row.get("category_ids") or "").split(";") if id.strip()]
+                yield reader.line_num, ItemCreate(
+                    name=row.get("name"),
+                    description=row.get("description") or None,
+                    price=row.get("price"),
+                    category_ids=category_ids,
+                )
+            except ValueError as e:
+                yield reader.line_num, _row_error(e)
+        return
+    for line_num, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("Row must be a JSON object")
+            yield line_num, ItemCreate(**row)
+        except ValueError as e:
+            yield line_num, _row_error(e)
+
+_NEXT_ITEM_IDS = text("SELECT nextval(pg_get_serial_sequence('items', 'id')) FROM generate_series(1, :n)")
+
+def _insert_item_rows(db, rows):
+    """Insert item rows with one executemany and return their ids, in row order.
+
+    Must run inside the caller's write transaction, after its first write.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        # Draw the ids from the items sequence first, so every row carries its own
+        ids = db.execute(_NEXT_ITEM_IDS, {"n": len(rows)}).scalars().all()
+        db.execute(insert(Item), [{"id": id, **row} for id, row in zip(ids, rows)])
+        return ids
+    if dialect == "sqlite":
+        # SQLite has a single writer, held by this transaction since its first
+        # write, and gives each new row max(rowid) + 1: the rows inserted here
+        # are exactly those above the current maximum, in insert order.
+        before = db.execute(select(func.max(Item.id))).scalar() or 0
+        db.execute(insert(Item), rows)
+        return db.execute(select(Item.id).where(Item.id > before).order_by(Item.id)).scalars().all()
+    stmt = insert(Item)
+    return [db.execute(stmt, row).inserted_primary_key[0] for row in rows]
+
+def _insert_item_batch(db, items):
+    """Insert validated items and their category links in one transaction."""
+    # The counter bump is the transaction's first write
+    bump_table_version(db.connection(), "items")
+    ids = _insert_item_rows(db, [
+        {"name": item.name, "description": item.description, "price": item.price} for item in items
+    ])
+    links = [
+        {"item_id": id, "category_id": category_id}
+        for id, item in zip(ids, items) for category_id in dict.fromkeys(item.category_ids)
+    ]
+    if links:
+        db.execute(insert(item_categories), links)
+    if uses_fts(db.get_bind()):
+        reindex_items(db.connection(), ids)
+    db.commit()
+
+@router.post("/import")
+def import_items(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_current_admin_user),
+):
+    """Bulk-create items from an NDJSON or CSV upload.
+
+    Rows carry name, description, price and category_ids (a JSON list, or
+    ";"-separated in CSV); ids in the file are ignored. The format comes from
+    the file name unless given. The upload is parsed as a stream and inserted
+    IMPORT_BATCH_SIZE rows per transaction, so memory stays flat; invalid
+    rows, including unknown category ids, are skipped and reported.
+    """
+    format = _import_format(format, file.filename)
+    category_ids = set(db.execute(select(Category.id)).scalars())
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    imported = failed = 0
+    errors = []
+    batch = []
+    for line_num, item in _read_import_rows(text, format):
+        if not isinstance(item, str):
+            unknown = [id for id in item.category_ids if id not in category_ids]
+            if not unknown:
+                batch.append(item)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    _insert_item_batch(db, batch)
+                    imported += len(batch)
+                    batch = []
+                continue
+            item = f"Unknown category ids: {unknown}"
+        failed += 1
+        if len(errors) < IMPORT_MAX_ERRORS:
+            errors.append({"line": line_num, "error": item})
+    if batch:
+        _insert_item_batch(db, batch)
+        imported += len(batch)
+    if imported:
+        category_tree_cache.invalidate()
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+def _export_chunks(format):
+    """Encode every item, EXPORT_BATCH_SIZE at a time, without loading the table."""
+    with SessionLocal() as db:
+        if format == "csv":
+            out = io.StringIO()
+            writer = csv.writer(out)
+            writer.writerow(CSV_FIELDS)
+            yield out.getvalue()
+        result = db.execute(
+            select(Item.id, Item.name, Item.description, Item.price)
+            .order_by(Item.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            categories = {}
+            links = db.execute(
+                select(item_categories.c.item_id, item_categories.c.category_id)
+                .where(item_categories.c.item_id.between(rows[0].id, rows[-1].id))
+            )
+            for item_id, category_id in links:
+                categories.setdefault(item_id, []).append(category_id)
+            if format == "csv":
+                out.seek(0)
+                out.truncate()
+                writer.writerows(
+                    (row.id, row.name, row.description, row.price, ";".join(map(str, categories.get(row.id, []))))
+                    for row in rows
+                )
+                yield out.getvalue()
+            else:
+                yield "".join(
+                    json.dumps({**row._mapping, "category_ids": categories.get(row.id, [])}) + "\n"
+                    for row in rows
+                )
+
+@router.get("/export")
+def export_items(format: str = "ndjson"):
+    """Stream every item as NDJSON or CSV, in the shape import_items accepts."""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Export format must be ndjson or csv")
+    return StreamingResponse(
+        _export_chunks(format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
+
 @router.get("/{item_id}", response_model=ItemRead) # Path becomes relative to the prefix
 def get_item(item_id: int, db: Session = Depends(get_db)):
     item = db.query(Item).get(item_id)
@@ -50,6 +298,7 @@ def update_item(item_id: int, item: ItemCreate, db: Session = Depends(get_db)):
     db_item.price = item.price
     db_item.categories = db.query(Category).filter(Category.id.in_(item.category_ids)).all() if item.category_ids else []
     db.commit()
+    category_tree_cache.invalidate()
     db.refresh(db_item)
     return ItemRead.from_orm_with_categories(db_item)
 
@@ -60,4 +309,5 @@ def delete_item(item_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Item not found")
     db.delete(db_item)
     db.commit()
+    category_tree_cache.invalidate()
     return {"ok": True}
\ No newline at end of file
@@ -1,21 +1,170 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
+import json
+import threading
+import time
 
 from app.db.session import get_db
 from app.db.models.category import Category
-from app.schemas.categories import Category as CategorySchema, CategoryCreate
+from app.db.models.item import item_categories
+from app.db.versioning import get_table_version
+from app.schemas.categories import Category as CategorySchema, CategoryCreate, CategoryTreeNode, CategoryBreadcrumb
 from app.routes.deps import get_current_admin_user
 from app.db.models.users import User
+from app.utils.config import get_config
+from app.utils.etag import make_etag, etag_matches, not_modified
 
 router = APIRouter(prefix="/api/v1/categories", tags=["categories"])
 
+# How long a process serves a cached tree before re-checking the change
+# counters, i.e. how stale another worker's edit can look.
+CATEGORY_TREE_CACHE_TTL = float(get_config("CATEGORY_TREE_CACHE_TTL", 2))
+
 class CategoryReorderItem(BaseModel):
     id: int
     parent_id: Optional[int] = None
     order: Optional[int] = None
 
+def subtree_filter(path, include_self=True):
+    """Clauses matching the categories under a materialized path, as an index range."""
+    # "0" sorts right after "/", so [path, path[:-1] + "0") is exactly the prefix range
+    return (Category.path >= path if include_self else Category.path > path, Category.path < path[:-1] + "0")
+
+def move_subtree(db, old_path, new_path):
+    """Rewrite the path prefix of a category and all its descendants in one UPDATE."""
+    db.execute(
+        update(Category)
+        .where(*subtree_filter(old_path))
+        .values(path=new_path + func.substr(Category.path, len(old_path) + 1))
+        .execution_options(synchronize_session=False)
+    )
+
+def build_paths(parents, ids):
+    """Materialized paths for ids, computed from a parent map that reaches the roots."""
+    paths = {}
+    for start in ids:
+        chain = []
+        node = start
+        while node is not None and node not in paths:
+            chain.append(node)
+            node = parents[node]
+        prefix = paths[node] if node is not None else "/"
+        for node in reversed(chain):
+            prefix = paths[node] = f"{prefix}{node}/"
+    return {id: paths[id] for id in ids}
+
+def build_category_tree(rows, item_counts=None):
+    """Nest (id, name, parent_id, selectable, order) rows under their parents in one pass.
+
+    Rows must already be in sibling order. Rows whose parent is missing
+    become roots; rows caught in a parent cycle are unreachable and dropped.
+    """
+    nodes = {}
+    for id, name, parent_id, selectable, order in rows:
+        node = {"id": id, "name": name, "parent_id": parent_id, "selectable": selectable, "order": order}
+        if item_counts is not None:
+            node["item_count"] = item_counts.get(id, 0)
+        node["children"] = []
+        nodes[id] = node
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        (parent["children"] if parent is not None else roots).append(node)
+    return roots
+
+def load_category_tree(db, with_counts=False, path=None):
+    """Build the tree, or the subtree under path, from one query (two with direct item counts)."""
+    rows = db.query(Category.id, Category.name, Category.parent_id, Category.selectable, Category.order)
+    if path is not None:
+        rows = rows.filter(*subtree_filter(path))
+    rows = rows.order_by(Category.order, Category.id).all()
+    item_counts = None
+    if with_counts:
+        counts = db.query(item_categories.c.category_id, func.count())
+        if path is not None:
+            counts = counts.join(Category, Category.id == item_categories.c.category_id).filter(*subtree_filter(path))
+        item_counts = dict(counts.group_by(item_categories.c.category_id).all())
+    return build_category_tree(rows, item_counts)
+
+class CategoryTreeCache:
+    """Encoded category trees keyed by the categories and items change counters.
+
+    Within CATEGORY_TREE_CACHE_TTL of the last check requests are served from
+    memory; after that two primary-key lookups tell whether another process
+    changed anything. Writes in this process call invalidate().
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # with_counts -> (versions, body, checked_at)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get(self, db, with_counts=False):
+        """Return (versions, encoded body), rebuilding from db only when needed."""
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(with_counts)
+            if entry is not None and time.monotonic() - entry[2] < self.ttl:
+                return entry[0], entry[1]
+        versions = (get_table_version(db, "categories"), get_table_version(db, "items"))
+        with self._lock:
+            if entry is not None and entry[0] == versions and self._entries.get(with_counts) is entry:
+                self._entries[with_counts] = (versions, entry[1], time.monotonic())
+                return versions, entry[1]
+        # Counters read first: if a write lands in between, the next check rebuilds again
+        body = json.dumps(load_category_tree(db, with_counts), separators=(",", ":")).encode()
+        with self._lock:
+            # Skip caching if a local write invalidated the cache while building
+            if generation == self._generation:
+                self._entries[with_counts] = (versions, body, time.monotonic())
+        return versions, body
+
+category_tree_cache = CategoryTreeCache(CATEGORY_TREE_CACHE_TTL)
+
+def load_ancestry(db, ids):
+    """Map id -> (parent_id, path) for the given categories and all their stored ancestors.
+
+    One recursive query; ids that do not exist are simply absent.
+    """
+    ancestry = (
+        select(Category.id, Category.parent_id, Category.path)
+        .where(Category.id.in_(ids))
+        .cte("ancestry", recursive=True)
+    )
+    # UNION (not UNION ALL) also stops on a cycle already stored in the table
+    ancestry = ancestry.union(
+        select(Category.id, Category.parent_id, Category.path).join(ancestry, Category.id == ancestry.c.parent_id)
+    )
+    rows = db.execute(select(ancestry.c.id, ancestry.c.parent_id, ancestry.c.path)).all()
+    return {id: (parent_id, path) for id, parent_id, path in rows}
+
+def find_cycle(parents, start_ids):
+    """Return the id of a node on a parent_id cycle reachable from start_ids, or None.
+
+    parents must hold every node reachable from start_ids; each node is
+    walked at most once overall.
+    """
+    done = set()
+    for start in start_ids:
+        path = set()
+        node = start
+        while node is not None and node not in done:
+            if node in path:
+                return node
+            path.add(node)
+            node = parents.get(node)
+        done |= path
+    return None
+
 @router.post("/", response_model=CategorySchema)
 def create_category(
     category: CategoryCreate,
@@ -25,6 +174,11 @@ def create_category(
     """Create a new category."""
     if db.query(Category).filter(Category.name == category.name).first():
         raise HTTPException(status_code=400, detail="Category name must be unique")
+    parent_path = "/"
+    if category.parent_id is not None:
+        parent_path = db.query(Category.path).filter(Category.id == category.parent_id).scalar()
+        if parent_path is None:
+            raise HTTPException(status_code=400, detail="Parent category not found")
     max_order = db.query(Category).filter(Category.parent_id == category.parent_id).order_by(Category.order.desc()).first()
     next_order = (max_order.order + 1) if max_order and max_order.order is not None else 0
     db_category = Category(
@@ -34,7 +188,10 @@ def create_category(
         order=next_order
     )
     db.add(db_category)
+    db.flush()
+    db_category.path = f"{parent_path}{db_category.id}/"
     db.commit()
+    category_tree_cache.invalidate()
     db.refresh(db_category)
     return db_category
 
@@ -43,6 +200,38 @@ def read_categories(db: Session = Depends(get_db)):
     """Return all categories ordered by parent and order."""
     return db.query(Category).order_by(Category.parent_id, Category.order).all()
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+def read_category_tree(request: Request, counts: bool = False, db: Session = Depends(get_db)):
+    """Return the nested category tree; with counts=true each node has its direct item count."""
+    versions, body = category_tree_cache.get(db, counts)
+    etag = make_etag("categories-tree", int(counts), *versions)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+def _category_path(db, category_id):
+    path = db.query(Category.path).filter(Category.id == category_id).scalar()
+    if path is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return path
+
+@router.get("/{category_id}/subtree", response_model=CategoryTreeNode)
+def read_category_subtree(category_id: int, counts: bool = False, db: Session = Depends(get_db)):
+    """Return a category with its nested descendants, read with one path-range query."""
+    tree = load_category_tree(db, counts, path=_category_path(db, category_id))[0]
+    return Response(content=json.dumps(tree, separators=(",", ":")), media_type="application/json")
+
+@router.get("/{category_id}/breadcrumb", response_model=List[CategoryBreadcrumb])
+def read_category_breadcrumb(category_id: int, db: Session = Depends(get_db)):
+    """Return the categories from the root down to this one."""
+    ids = [int(id) for id in _category_path(db, category_id).strip("/").split("/")]
+    names = dict(db.query(Category.id, Category.name).filter(Category.id.in_(ids)).all())
+    return [{"id": id, "name": names[id]} for id in ids if id in names]
+
 @router.put("/{category_id}", response_model=CategorySchema)
 def update_category(
     category_id: int,
@@ -56,10 +245,23 @@ def update_category(
         raise HTTPException(status_code=404, detail="Category not found")
     if db.query(Category).filter(Category.name == category.name, Category.id != category_id).first():
         raise HTTPException(status_code=400, detail="Category name must be unique")
+    if category.parent_id != db_category.parent_id:
+        new_path = f"/{category_id}/"
+        if category.parent_id is not None:
+            stored = load_ancestry(db, {category.parent_id})
+            if category.parent_id not in stored:
+                raise HTTPException(status_code=400, detail="Parent category not found")
+            parents = {id: parent_id for id, (parent_id, _) in stored.items()}
+            parents[category_id] = category.parent_id
+            if find_cycle(parents, [category_id]) is not None:
+                raise HTTPException(status_code=400, detail="A category cannot be moved under itself")
+            new_path = f"{stored[category.parent_id][1]}{category_id}/"
+        move_subtree(db, db_category.path, new_path)
     db_category.name = category.name
     db_category.parent_id = category.parent_id
     db_category.selectable = category.selectable
     db.commit()
+    category_tree_cache.invalidate()
     db.refresh(db_category)
     return db_category
 
@@ -73,8 +275,16 @@ def delete_category(
     db_category = db.query(Category).filter(Category.id == category_id).first()
     if not db_category:
         raise HTTPException(status_code=404, detail="Category not found")
+    # Its children become roots, taking their subtrees with them
+    db.execute(
+        update(Category)
+        .where(*subtree_filter(db_category.path, include_self=False))
+        .values(path="/" + func.substr(Category.path, len(db_category.path) + 1))
+        .execution_options(synchronize_session=False)
+    )
     db.delete(db_category)
     db.commit()
+    category_tree_cache.invalidate()
 
 @router.post("/reorder", status_code=204)
 def reorder_categories(
@@ -82,12 +292,45 @@ def reorder_categories(
     db: Session = Depends(get_db),
     admin: User = Depends(get_current_admin_user),
 ):
-    """Reorder categories based on drag-and-drop from the frontend."""
-    cat_map = {item.id: item for item in categories}
-    db_categories = db.query(Category).all()
-    for db_category in db_categories:
-        item = cat_map.get(db_category.id)
-        if item is not None:
-            db_category.parent_id = item.parent_id
-            db_category.order = item.order
-    db.commit()
\ No newline at end of file
+    """Reorder categories based on drag-and-drop from the frontend.
+
+    Only the submitted categories are read and written: their stored
+    ancestry is loaded with one recursive query to reject unknown ids and
+    parent cycles, then one executemany UPDATE applies the moves and one
+    UPDATE per re-parented category rewrites its subtree's paths.
+    """
+    if not categories:
+        return
+    moves = {item.id: item for item in categories}
+    if len(moves) != len(categories):
+        raise HTTPException(status_code=400, detail="Duplicate category ids in reorder")
+    parent_ids = {item.parent_id for item in categories if item.parent_id is not None}
+    stored = load_ancestry(db, set(moves) | parent_ids)
+    parents = {id: parent_id for id, (parent_id, _) in stored.items()}
+    unknown = sorted(set(moves) - set(parents))
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown category ids: {unknown}")
+    unknown = sorted(parent_ids - set(parents))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown parent category ids: {unknown}")
+    parents.update((item.id, item.parent_id) for item in categories)
+    cycle = find_cycle(parents, moves)
+    if cycle is not None:
+        raise HTTPException(status_code=400, detail=f"Category {cycle} would become its own ancestor")
+    stmt = (
+        update(Category)
+        .where(Category.id == bindparam("_id"))
+        # A move without an order keeps the stored one
+        .values(parent_id=bindparam("_parent_id"), order=func.coalesce(bindparam("_order"), Category.order))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(stmt, [{"_id": item.id, "_parent_id": item.parent_id, "_order": item.order} for item in categories])
+    moved = [id for id, item in moves.items() if item.parent_id != stored[id][0]]
+    new_paths = build_paths(parents, moved)
+    # Deepest first: a subtree is rewritten before any moved ancestor rewrites around it,
+    # and no final path can fall back under an old prefix that is still to be rewritten
+    for id in sorted(moved, key=lambda id: stored[id][1].count("/"), reverse=True):
+        if new_paths[id] != stored[id][1]:
+            move_subtree(db, stored[id][1], new_paths[id])
+    db.commit()
+    category_tree_cache.invalidate()
\ No newline at end of file
@@ -4,18 +4,43 @@ from jose import JWTError
 from app.core.security import decode_access_token
 from app.db.session import get_db
 from app.db.models.users import User
+from app.utils.cache import TTLCache
+from app.utils.config import get_config
 from sqlalchemy.orm import Session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/login")
 
+# user_id -> column values of the authenticated user (without the password hash).
+# Edits made through another process are picked up once the entry expires.
+user_cache = TTLCache(
+    ttl=float(get_config("USER_CACHE_TTL", 30)),
+    maxsize=int(get_config("USER_CACHE_SIZE", 1024)),
+)
+_CACHED_COLUMNS = [c.name for c in User.__table__.columns if c.name != "hashed_password"]
+
+def invalidate_user(user_id):
+    user_cache.invalidate(lambda key: key == user_id)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     payload = decode_access_token(token)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid authentication")
-    user = db.query(User).filter(User.username == payload["sub"]).first()
-    if not user:
+    user_id = payload.get("user_id")
+    fields = user_cache.get(user_id) if user_id is not None else None
+    if fields is None:
+        user = db.query(User).filter(User.username == payload["sub"]).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        if user.id != user_id:
+            return user
+        fields = {name: getattr(user, name) for name in _CACHED_COLUMNS}
+        user_cache.set(user_id, fields)
+    elif fields["username"] != payload["sub"]:
+        # Renamed since the token was issued; same outcome as the username lookup
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    # A fresh transient instance per request, so callers never share cached state
+    return User(**fields)
+
 def get_current_admin_user(current_user: User = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not enough permissions")
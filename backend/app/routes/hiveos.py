@@ -1,13 +1,22 @@
 # FastAPI router for HiveOS proxy endpoints
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import httpx
 import requests
+from datetime import datetime, timedelta
+from jose import jwt, JWTError
 from typing import Optional
+from app.core.security import SECRET_KEY, ALGORITHM
 from app.utils.http import safe_get, safe_post
+from app.utils.cache import TTLCache
 from app.utils.config import get_config
 from app.utils.logger import get_logger
 from app.utils.decorators import retry
+from app.hiveos_poller import hub, _token_hash
 
 router = APIRouter(prefix="/api/v1/hiveos", tags=["HiveOS"])
 logger = get_logger("hiveos")
@@ -22,6 +31,9 @@ class HiveOSRigRequest(HiveOSFarmRequest):
 class HiveOSActionRequest(HiveOSRigRequest):
     action: str
 
+class HiveOSFarmDeltaRequest(HiveOSFarmRequest):
+    since_version: Optional[str] = None
+
 HIVEOS_API_BASE = "https://api2.hiveos.farm/api/v2"
 ALLOWED_ACTIONS = [
     'miners/start',
@@ -30,18 +42,67 @@ ALLOWED_ACTIONS = [
     'reboot',
 ]
 
-@router.post("/farm")
-@retry(times=2)
-async def get_farm(data: HiveOSFarmRequest):
+# Stream tickets stand in for the HiveOS token in the SSE URL, since EventSource
+# cannot send headers and query strings end up in access logs.
+STREAM_TICKET_AUDIENCE = "hiveos-stream"
+STREAM_TICKET_TTL = timedelta(seconds=float(get_config("HIVEOS_STREAM_TICKET_TTL", 60)))
+
+# Shared read cache so N displays polling the same farm cost one upstream call per TTL
+read_cache = TTLCache(
+    ttl=float(get_config("HIVEOS_CACHE_TTL", 10)),
+    maxsize=int(get_config("HIVEOS_CACHE_SIZE", 256)),
+)
+
+def _cache_key(token, farm_id, worker_id=None):
+    token_hash = hashlib.sha256((token or "").encode()).hexdigest()
+    return (token_hash, str(farm_id), str(worker_id) if worker_id else None)
+
+def invalidate_farm_cache(farm_id, worker_id=None):
+    """Drop cached reads for a farm, or only for one rig and its farm list."""
+    farm_id = str(farm_id)
+    worker_id = str(worker_id) if worker_id else None
+    read_cache.invalidate(
+        lambda key: key[1] == farm_id and (worker_id is None or key[2] in (None, worker_id))
+    )
+
+async def _fetch_farm(data: HiveOSFarmRequest):
+    """Read the farm's workers through the cache and record them as a versioned snapshot."""
     token = data.token or get_config("HIVE_TOKEN")
     farm_id = data.farm_id or get_config("HIVE_FARM_ID")
     url = f"https://api2.hiveos.farm/api/v2/farms/{farm_id}/workers"
     headers = {"Authorization": f"Bearer {token}"}
-    result = await safe_get(url, headers=headers)
+    result = await read_cache.get_or_fetch(
+        _cache_key(token, farm_id), lambda: safe_get(url, headers=headers)
+    )
     if not result or "data" not in result:
         logger.warning(f"HiveOS API error: {result}")
         raise HTTPException(status_code=502, detail="HiveOS API error")
-    return {"rigs": result["data"]}
+    version = hub.publish(farm_id, result["data"])
+    return farm_id, result["data"], version
+
+@router.post("/farm")
+@retry(times=2)
+async def get_farm(data: HiveOSFarmRequest):
+    farm_id, rigs, version = await _fetch_farm(data)
+    return {"rigs": rigs, "version": version}
+
+@router.post("/farm/delta")
+@retry(times=2)
+async def get_farm_delta(data: HiveOSFarmDeltaRequest):
+    """Return only the workers added, changed or removed since `since_version`.
+
+    Responds 304 when nothing changed, and with a full snapshot when the
+    version is missing, too old or was issued by another process. Farms the
+    poller does not track always get a full, unversioned snapshot.
+    """
+    farm_id, rigs, version = await _fetch_farm(data)
+    if version is None:
+        # Not a polled farm, so the hub keeps no versions for it
+        return {"type": "snapshot", "version": None, "rigs": rigs}
+    delta = hub.delta(farm_id, data.since_version)
+    if delta is None:
+        return Response(status_code=304)
+    return delta
 
 @router.post("/rig")
 @retry(times=2)
@@ -51,53 +112,162 @@ async def get_rig(data: HiveOSRigRequest):
     worker_id = data.worker_id
     url = f"https://api2.hiveos.farm/api/v2/farms/{farm_id}/workers/{worker_id}"
     headers = {"Authorization": f"Bearer {token}"}
-    result = await safe_get(url, headers=headers)
+    result = await read_cache.get_or_fetch(
+        _cache_key(token, farm_id, worker_id), lambda: safe_get(url, headers=headers)
+    )
     if not result:
         logger.warning(f"HiveOS API error: {result}")
         raise HTTPException(status_code=502, detail="HiveOS API error")
     return result
 
+@router.post("/stream/ticket")
+async def create_stream_ticket(data: HiveOSFarmRequest):
+    """Exchange a HiveOS token for a short-lived ticket that opens the farm's event stream."""
+    farm_id = str(data.farm_id)
+    if not hub.authorized(farm_id, data.token):
+        raise HTTPException(status_code=404, detail="Farm is not polled")
+    claims = {
+        "aud": STREAM_TICKET_AUDIENCE,
+        "farm_id": farm_id,
+        "token_hash": _token_hash(data.token),
+        "exp": datetime.utcnow() + STREAM_TICKET_TTL,
+    }
+    ticket = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    return {"ticket": ticket, "expires_in": int(STREAM_TICKET_TTL.total_seconds())}
+
+def _stream_ticket_valid(ticket, farm_id):
+    try:
+        claims = jwt.decode(ticket, SECRET_KEY, algorithms=[ALGORITHM], audience=STREAM_TICKET_AUDIENCE)
+    except JWTError:
+        return False
+    # Tokens removed from the farm's widgets stop opening streams even before the ticket expires
+    return (
+        claims.get("aud") == STREAM_TICKET_AUDIENCE
+        and claims.get("farm_id") == farm_id
+        and claims.get("token_hash") in hub.tokens.get(farm_id, {})
+    )
+
+@router.get("/stream/{farm_id}")
+async def stream_farm(farm_id: str, ticket: str, request: Request):
+    """Server-sent events for a polled farm: one snapshot, then worker diffs.
+
+    Opened with a ticket from POST /stream/ticket; an expired ticket gets a 401
+    and the client fetches a new one.
+    """
+    if not _stream_ticket_valid(ticket, farm_id):
+        raise HTTPException(status_code=401, detail="Invalid or expired stream ticket")
+    queue = hub.subscribe(farm_id)
+
+    async def events():
+        try:
+            event = hub.snapshot_event(farm_id)
+            while True:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                while True:
+                    if await request.is_disconnected():
+                        return
+                    try:
+                        event = await asyncio.wait_for(queue.get(), 15)
+                        break
+                    except asyncio.TimeoutError:
+                        yield ": keepalive\n\n"
+        finally:
+            hub.unsubscribe(farm_id, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+FANOUT_CONCURRENCY = int(get_config("HIVEOS_FANOUT_CONCURRENCY", 20))
+# Bound on one command request. Commands are sent once: retrying after a
+# timeout could repeat a reboot still in flight, so only HiveOSJob retries,
+# and only the workers that reported failure.
+WORKER_TIMEOUT = float(get_config("HIVEOS_WORKER_TIMEOUT", 15))
+
+def _command_payload(action):
+    if action in ["miners/start", "miners/stop"]:
+        miner_action = "start" if action == "miners/start" else "stop"
+        return {"command": "miner", "data": {"action": miner_action}}
+    if action in ["reboot", "shutdown"]:
+        return {"command": action}
+    return None
+
+async def _send_worker_command(worker, farm_id, action, headers, semaphore):
+    worker_id = worker.get("id") or worker.get("worker_id")
+    if not worker_id:
+        logger.warning(f"Worker missing id: {worker}")
+        return {"worker_id": None, "status": "error", "error": "missing_id"}
+    payload = _command_payload(action)
+    if payload is None:
+        logger.warning(f"Unsupported action: {action}")
+        return {"worker_id": worker_id, "status": "error", "error": "unsupported_action"}
+    url = f"{HIVEOS_API_BASE}/farms/{farm_id}/workers/{worker_id}/command"
+    async with semaphore:
+        try:
+            result = await asyncio.wait_for(
+                safe_post(url, headers=headers, json=payload, retries=0, timeout=WORKER_TIMEOUT), WORKER_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"HiveOS {action} timed out for worker {worker_id}")
+            return {"worker_id": worker_id, "status": "error", "error": "timeout"}
+        except Exception as e:
+            logger.warning(f"HiveOS {action} failed for worker {worker_id}: {e}")
+            return {"worker_id": worker_id, "status": "error", "error": str(e)}
+    if result:
+        return {"worker_id": worker_id, "status": "ok"}
+    logger.warning(f"HiveOS {action} failed for worker {worker_id}")
+    return {"worker_id": worker_id, "status": "error", "error": "no_result"}
+
+def _command_headers(token):
+    return {"Authorization": f"Bearer {token or get_config('HIVE_TOKEN')}", "Content-Type": "application/json"}
+
+async def _farm_command_tasks(token, farm_id, action, worker_ids=None):
+    """Start one command task per worker; all workers in the farm unless worker_ids is given."""
+    if action not in ALLOWED_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid action: {action}")
+    headers = _command_headers(token)
+    farm_id = farm_id or get_config('HIVE_FARM_ID')
+    if worker_ids:
+        workers = [{"id": worker_id} for worker_id in worker_ids]
+    else:
+        # Get all workers in the farm
+        workers_url = f"{HIVEOS_API_BASE}/farms/{farm_id}/workers"
+        workers_result = await safe_get(workers_url, headers=headers)
+        if not workers_result or "data" not in workers_result:
+            logger.warning(f"HiveOS API error: {workers_result}")
+            raise HTTPException(status_code=502, detail="HiveOS API error (fetching workers)")
+        workers = workers_result["data"]
+    semaphore = asyncio.Semaphore(FANOUT_CONCURRENCY)
+    return [
+        asyncio.ensure_future(_send_worker_command(worker, farm_id, action, headers, semaphore))
+        for worker in workers
+    ]
+
+async def run_hiveos_action(token, farm_id, action, worker_ids=None):
+    """Send an action to some or all workers of a farm and return per-worker results."""
+    tasks = await _farm_command_tasks(token, farm_id, action, worker_ids)
+    results = await asyncio.gather(*tasks)
+    invalidate_farm_cache(farm_id or get_config('HIVE_FARM_ID'))
+    return list(results)
+
 @router.post("/farm/action")
 @retry(times=2)
 async def farm_action(data: HiveOSActionRequest):
-    if data.action not in ALLOWED_ACTIONS:
-        raise HTTPException(status_code=400, detail=f"Invalid action: {data.action}")
-    headers = {"Authorization": f"Bearer {data.token or get_config('HIVE_TOKEN')}", "Content-Type": "application/json"}
-    farm_id = data.farm_id or get_config('HIVE_FARM_ID')
-    # Get all workers in the farm
-    workers_url = f"{HIVEOS_API_BASE}/farms/{farm_id}/workers"
-    workers_result = await safe_get(workers_url, headers=headers)
-    if not workers_result or "data" not in workers_result:
-        logger.warning(f"HiveOS API error: {workers_result}")
-        raise HTTPException(status_code=502, detail="HiveOS API error (fetching workers)")
-    results = []
-    for worker in workers_result["data"]:
-        worker_id = worker.get("id") or worker.get("worker_id")
-        if not worker_id:
-            logger.warning(f"Worker missing id: {worker}")
-            results.append({"worker_id": None, "status": "error", "error": "missing_id"})
-            continue
-        url = f"{HIVEOS_API_BASE}/farms/{farm_id}/workers/{worker_id}/command"
-        if data.action in ["miners/start", "miners/stop"]:
-            miner_action = "start" if data.action == "miners/start" else "stop"
-            payload = {"command": "miner", "data": {"action": miner_action}}
-        elif data.action in ["reboot", "shutdown"]:
-            payload = {"command": data.action}
-        else:
-            logger.warning(f"Unsupported action: {data.action}")
-            results.append({"worker_id": worker_id, "status": "error", "error": "unsupported_action"})
-            continue
+    return {"results": await run_hiveos_action(data.token, data.farm_id, data.action)}
+
+@router.post("/farm/action/stream")
+async def farm_action_stream(data: HiveOSActionRequest):
+    """Run a farm action and stream one NDJSON result line per worker as it completes."""
+    tasks = await _farm_command_tasks(data.token, data.farm_id, data.action)
+
+    async def generate():
         try:
-            result = await safe_post(url, headers=headers, json=payload)
-            if result:
-                results.append({"worker_id": worker_id, "status": "ok"})
-            else:
-                logger.warning(f"HiveOS {data.action} failed for worker {worker_id}")
-                results.append({"worker_id": worker_id, "status": "error", "error": "no_result"})
-        except Exception as e:
-            logger.warning(f"HiveOS {data.action} failed for worker {worker_id}: {e}")
-            results.append({"worker_id": worker_id, "status": "error", "error": str(e)})
-    return {"results": results}
+            for done in asyncio.as_completed(tasks):
+                yield json.dumps(await done) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            invalidate_farm_cache(data.farm_id or get_config('HIVE_FARM_ID'))
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @router.post("/rig/action")
 @retry(times=2)
@@ -121,6 +291,7 @@ async def rig_action(data: HiveOSActionRequest):
                 logger.warning(f"HiveOS {data.action} not supported for worker {worker_id}")
                 raise HTTPException(status_code=404, detail=f"{data.action.capitalize()} not supported for this rig (worker_id={worker_id})")
             raise
+        invalidate_farm_cache(farm_id, worker_id)
         if not result:
             logger.warning(f"HiveOS {data.action} failed for worker {worker_id}")
             raise HTTPException(status_code=502, detail=f"HiveOS {data.action} failed for worker {worker_id}")
@@ -135,6 +306,7 @@ async def rig_action(data: HiveOSActionRequest):
                 logger.warning(f"HiveOS {data.action} not supported for worker {worker_id}")
                 raise HTTPException(status_code=404, detail=f"{data.action.capitalize()} not supported for this rig (worker_id={worker_id})")
             raise
+        invalidate_farm_cache(farm_id, worker_id)
         if not result:
             logger.warning(f"HiveOS {data.action} failed for worker {worker_id}")
             raise HTTPException(status_code=502, detail=f"HiveOS {data.action} failed for worker {worker_id}")
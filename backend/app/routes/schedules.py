@@ -1,10 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models.schedule import Schedule as ScheduleModel
 from app.db.models.widget import Widget as WidgetModel
+from app.db.models.schedule_run import ScheduleRun as ScheduleRunModel
+from app.schedule_worker import notify_schedule_changed
+from app.job_queue import supported_actions
 
 router = APIRouter(prefix="/api/v1/schedules", tags=["schedules"])
 
@@ -12,7 +16,7 @@ class ScheduleBase(BaseModel):
     widget_id: int
     action: str  # e.g. 'miners/start', 'miners/stop', 'shutdown'
     time: str    # ISO time string, e.g. '2025-06-26T21:00:00'
-    repeat: Optional[str] = None  # e.g. 'daily', 'once', 'weekly'
+    repeat: Optional[str] = None  # 'once', 'daily', 'weekly' or a cron expression like '0 18 * * 1-5'
 
 class ScheduleCreate(ScheduleBase):
     pass
@@ -22,21 +26,60 @@ class ScheduleUpdate(ScheduleBase):
 
 class Schedule(ScheduleBase):
     id: int
+    next_run: Optional[datetime] = None
+
+class ScheduleRun(BaseModel):
+    id: int
+    schedule_id: int
+    widget_id: int
+    action: str
+    status: str
+    attempts: int
+    scheduled_for: Optional[datetime] = None
+    queued_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+def _check_widget_action(db, widget_id, action):
+    """Reject schedules whose widget is missing or cannot run the action."""
+    widget = db.query(WidgetModel).filter(WidgetModel.id == widget_id).first()
+    if not widget:
+        raise HTTPException(status_code=400, detail="Widget not found")
+    if action not in supported_actions(widget.type):
+        raise HTTPException(status_code=400, detail=f"Unsupported action for {widget.type} widget: {action}")
+
+def _reschedule(sched):
+    try:
+        sched.reschedule()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[Schedule])
 def list_schedules(db: Session = Depends(get_db)):
     return db.query(ScheduleModel).all()
 
+@router.get("/runs", response_model=List[ScheduleRun])
+def list_schedule_runs(schedule_id: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Execution log, newest first."""
+    query = db.query(ScheduleRunModel)
+    if schedule_id is not None:
+        query = query.filter(ScheduleRunModel.schedule_id == schedule_id)
+    return query.order_by(ScheduleRunModel.id.desc()).limit(min(limit, 1000)).all()
+
 @router.post("/", response_model=Schedule)
 def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
-    # Validate widget exists
-    widget = db.query(WidgetModel).filter(WidgetModel.id == schedule.widget_id).first()
-    if not widget:
-        raise HTTPException(status_code=400, detail="Widget not found")
+    _check_widget_action(db, schedule.widget_id, schedule.action)
     sched = ScheduleModel(**schedule.dict())
+    _reschedule(sched)
     db.add(sched)
     db.commit()
     db.refresh(sched)
+    notify_schedule_changed(sched.id)
     return sched
 
 @router.put("/{schedule_id}", response_model=Schedule)
@@ -44,10 +87,16 @@ def update_schedule(schedule_id: int, schedule: ScheduleUpdate, db: Session = De
     sched = db.query(ScheduleModel).filter(ScheduleModel.id == schedule_id).first()
     if not sched:
         raise HTTPException(status_code=404, detail="Schedule not found")
+    timing = (sched.time, sched.repeat)
     for key, value in schedule.dict(exclude_unset=True).items():
         setattr(sched, key, value)
+    _check_widget_action(db, sched.widget_id, sched.action)
+    # Only re-arm when the timing changed, so editing a finished schedule does not re-fire it
+    if (sched.time, sched.repeat) != timing:
+        _reschedule(sched)
     db.commit()
     db.refresh(sched)
+    notify_schedule_changed(sched.id)
     return sched
 
 @router.delete("/{schedule_id}")
@@ -57,4 +106,5 @@ def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Schedule not found")
     db.delete(sched)
     db.commit()
+    notify_schedule_changed(schedule_id)
     return {"ok": True}
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models.settings import Settings
 from app.schemas.settings import SettingsSchema
 from app.routes.deps import get_current_admin_user
-import json
+from app.db.versioning import get_table_version
+from app.utils.config import get_config
+from app.utils.etag import make_etag, etag_matches, not_modified
+import threading
+import time
 
 router = APIRouter(prefix="/api/v1/settings", tags=["settings"])
 
-@router.get("", response_model=SettingsSchema)
-def get_settings(db: Session = Depends(get_db)):
-    settings = db.query(Settings).first()
+# How long a process serves its cached settings before re-checking the
+# settings change counter, i.e. how stale another worker's edit can look.
+SETTINGS_CACHE_TTL = float(get_config("SETTINGS_CACHE_TTL", 2))
+
+def parse_settings(settings):
+    """Turn a Settings row (or None) into the public settings payload."""
     if not settings:
         # Only create defaults if settings row does not exist
         return {
@@ -19,38 +26,64 @@ def get_settings(db: Session = Depends(get_db)):
             "siteContent": {"en": ""},
             "menu": []
         }
+    return {
+        "languages": settings.languages or ["en"],
+        "siteName": settings.site_name or {"en": ""},
+        "siteContent": settings.site_content or {"en": ""},
+        "menu": settings.menu or [],
+    }
 
-    def parse_json_field(val, default):
-        if val is None or val == "":
-            return default
-        if isinstance(val, dict) or isinstance(val, list):
-            return val
-        try:
-            return json.loads(val)
-        except Exception:
-            return default
+class SettingsCache:
+    """Parsed and encoded settings, keyed by the settings change counter.
 
-    # Handle languages (could be comma-separated or JSON)
-    langs = settings.languages
-    if isinstance(langs, list):
-        languages = langs
-    elif isinstance(langs, str):
-        if langs.strip().startswith("["):
-            try:
-                languages = json.loads(langs)
-            except Exception:
-                languages = [l.strip() for l in langs.split(",") if l.strip()]
-        else:
-            languages = [l.strip() for l in langs.split(",") if l.strip()]
-    else:
-        languages = ["en"]
+    Within SETTINGS_CACHE_TTL of the last check requests are served from
+    memory; after that one primary-key lookup tells whether another process
+    changed the settings. Writes in this process replace the entry directly.
+    """
 
-    return {
-        "languages": languages,
-        "siteName": parse_json_field(settings.site_name, {"en": ""}),
-        "siteContent": parse_json_field(settings.site_content, {"en": ""}),
-        "menu": parse_json_field(settings.menu, []),
-    }
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.version = None
+        self.body = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def store(self, version, payload):
+        body = SettingsSchema(**payload).json().encode()
+        with self._lock:
+            self.version, self.body, self.checked_at = version, body, time.monotonic()
+        return body
+
+    def get(self, db):
+        """Return (version, encoded body), reloading from db only when needed."""
+        with self._lock:
+            if self.body is not None and time.monotonic() - self.checked_at < self.ttl:
+                return self.version, self.body
+        version = get_table_version(db, "settings")
+        with self._lock:
+            if version == self.version:
+                self.checked_at = time.monotonic()
+                return self.version, self.body
+        # Counter read first: if a write lands in between, the next check reloads again
+        return version, self.store(version, parse_settings(db.query(Settings).first()))
+
+settings_cache = SettingsCache(SETTINGS_CACHE_TTL)
+
+def _settings_response(version, body):
+    etag = make_etag("settings", version)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+@router.get("", response_model=SettingsSchema)
+def get_settings(request: Request, db: Session = Depends(get_db)):
+    version, body = settings_cache.get(db)
+    etag = make_etag("settings", version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return _settings_response(version, body)
 
 @router.put("", response_model=SettingsSchema)
 def update_settings(
@@ -63,17 +96,15 @@ def update_settings(
     if not settings:
         settings = Settings()
         db.add(settings)
-    settings.languages = ",".join(data.languages)
-    settings.set_site_name(data.siteName)
-    settings.set_site_content(data.siteContent)
-    # Serialize menu to JSON string before saving
-    import json
-    settings.menu = json.dumps([m.dict() if hasattr(m, "dict") else m for m in data.menu])
+    settings.languages = data.languages
+    settings.site_name = data.siteName
+    settings.site_content = data.siteContent
+    settings.menu = [m.dict() for m in data.menu]
+    db.flush()
+    # Read inside the write transaction so the counter is the one this write produced
+    version = get_table_version(db, "settings")
     db.commit()
     db.refresh(settings)
-    return {
-        "languages": settings.languages.split(","),
-        "siteName": settings.get_site_name(),
-        "siteContent": settings.get_site_content(),
-        "menu": settings.get_menu(),
-    }
\ No newline at end of file
+    # Write-through: this process serves the new settings without re-reading them
+    body = settings_cache.store(version, parse_settings(settings))
+    return _settings_response(version, body)
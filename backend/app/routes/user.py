@@ -1,37 +1,50 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.db.models.users import User
 from app.schemas.users import UserCreate, UserRead, UserLogin, UserUpdate
-from app.core.security import get_password_hash, verify_password, create_access_token
-from app.routes.deps import get_current_user, get_current_admin_user
+from app.core.security import hash_password_async, verify_and_update_password_async, create_access_token
+from app.routes.deps import get_current_user, get_current_admin_user, invalidate_user
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 @router.post("/register", response_model=UserRead)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user (public)."""
-    if db.query(User).filter((User.username == user.username) | (User.email == user.email)).first():
+    existing = await db.execute(
+        select(User.id).where((User.username == user.username) | (User.email == user.email))
+    )
+    if existing.first():
         raise HTTPException(status_code=400, detail="Username or email already registered")
     db_user = User(
         username=user.username,
         email=user.email,
-        hashed_password=get_password_hash(user.password),
+        hashed_password=await hash_password_async(user.password),
         role="registered"
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login and get a token (public)."""
-    db_user = db.query(User).filter(User.username == user.username).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    result = await db.execute(select(User).where(User.username == user.username))
+    db_user = result.scalars().first()
+    if not db_user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_password_async(user.password, db_user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored with a different bcrypt cost; upgrade it now that we know the password
+        db_user.hashed_password = new_hash
+        await db.commit()
     token = create_access_token({"sub": db_user.username, "role": db_user.role, "user_id": db_user.id})
     return {"access_token": token, "token_type": "bearer"}
 
@@ -41,13 +54,13 @@ def read_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/me", response_model=UserRead)
-def update_me(
+async def update_me(
     user: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update current user's info."""
-    db_user = db.query(User).filter(User.id == current_user.id).first()
+    db_user = await db.get(User, current_user.id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     if user.username is not None:
@@ -56,11 +69,15 @@ def update_me(
         db_user.email = user.email
     if user.password is not None:
         # Require old_password to change password
-        if not user.old_password or not verify_password(user.old_password, db_user.hashed_password):
+        if not user.old_password:
             raise HTTPException(status_code=400, detail="Old password is incorrect.")
-        db_user.hashed_password = get_password_hash(user.password)
-    db.commit()
-    db.refresh(db_user)
+        valid, _ = await verify_and_update_password_async(user.old_password, db_user.hashed_password)
+        if not valid:
+            raise HTTPException(status_code=400, detail="Old password is incorrect.")
+        db_user.hashed_password = await hash_password_async(user.password)
+    await db.commit()
+    invalidate_user(db_user.id)
+    await db.refresh(db_user)
     return db_user
 
 @router.get("/", response_model=List[UserRead])
@@ -84,6 +101,7 @@ def update_user(
         raise HTTPException(status_code=404, detail="User not found")
     db_user.role = user.role
     db.commit()
+    invalidate_user(db_user.id)
     db.refresh(db_user)
     return db_user
 
@@ -98,4 +116,5 @@ def delete_user(
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(db_user)
-    db.commit()
\ No newline at end of file
+    db.commit()
+    invalidate_user(user_id)
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request, Response, Query
+from fastapi.responses import JSONResponse
 from typing import List, Optional
 from pydantic import BaseModel
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.orm.exc import StaleDataError
+from app.db.session import get_db, get_async_db
 from app.db.models.widget import Widget as WidgetModel
+from app.db.versioning import get_table_version
+from app.utils.etag import make_etag, etag_matches, not_modified, set_etag
 import os
 import zipfile
 import shutil
@@ -25,14 +31,78 @@ class WidgetUpdate(WidgetBase):
 
 class Widget(WidgetBase):
     id: int
+    version: Optional[int] = None
+
+class WidgetLayout(BaseModel):
+    id: int
+    version: int  # the version the client last saw; stale writes are rejected
+    size: Optional[dict] = None
+    pos: Optional[dict] = None
+    background: Optional[str] = None
+
+class WidgetLayoutUpdate(BaseModel):
+    widgets: List[WidgetLayout]
 
 router = APIRouter(prefix="/api/v1/widgets", tags=["widgets"])
 
 WIDGETS_BASE_DIR = os.path.join(os.path.dirname(__file__), '../../widgets')
 
+# Fields selectable with ?fields=
+WIDGET_FIELDS = ("id", "type", "enabled", "config", "size", "pos", "background", "version")
+
 @router.get("/", response_model=List[Widget])
-def list_widgets(db: Session = Depends(get_db)):
-    return db.query(WidgetModel).all()
+async def list_widgets(
+    request: Request,
+    response: Response,
+    enabled: Optional[bool] = None,
+    widget_type: Optional[str] = Query(None, alias="type"),
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List widgets ordered by id, optionally filtered, paged and trimmed to some fields.
+
+    `cursor` is the last id of the previous page; when more rows follow a
+    `limit`-sized page, the X-Next-Cursor header holds the next cursor.
+    """
+    columns = None
+    if fields:
+        names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = set(names) - set(WIDGET_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown widget fields: {', '.join(sorted(unknown))}")
+        columns = names
+    # Read the counter before the rows so a concurrent write can only make the ETag too old
+    etag = make_etag("widgets", await db.run_sync(get_table_version, "widgets"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    if columns:
+        # id is always selected for the cursor and dropped afterwards if not requested
+        stmt = select(WidgetModel.id.label("_cursor"), *(getattr(WidgetModel, c) for c in columns))
+    else:
+        stmt = select(WidgetModel)
+    if enabled is not None:
+        stmt = stmt.where(WidgetModel.enabled == enabled)
+    if widget_type:
+        stmt = stmt.where(WidgetModel.type == widget_type)
+    if cursor is not None:
+        stmt = stmt.where(WidgetModel.id > cursor)
+    stmt = stmt.order_by(WidgetModel.id)
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.all() if columns else result.scalars().all()
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]._cursor if columns else rows[-1].id
+    if columns:
+        response = JSONResponse([{c: row._mapping[c] for c in columns} for row in rows])
+    set_etag(response, etag)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response if columns else rows
 
 @router.post("/", response_model=Widget)
 def create_widget(widget: WidgetCreate, db: Session = Depends(get_db)):
@@ -50,22 +120,75 @@ def list_available_widgets():
     widgets = [d for d in os.listdir(WIDGETS_BASE_DIR) if os.path.isdir(os.path.join(WIDGETS_BASE_DIR, d))]
     return {"widgets": widgets}
 
+@router.patch("/layout")
+async def update_layout(layout: WidgetLayoutUpdate, db: AsyncSession = Depends(get_async_db)):
+    """Save size/pos/background for many widgets in one transaction.
+
+    Each widget only updates if its version still matches, otherwise the whole
+    save is rolled back with 409 and the current versions of the stale widgets.
+    """
+    ids = [w.id for w in layout.widgets]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate widget ids in layout")
+    # One executemany per distinct set of submitted fields (normally just one)
+    groups = {}
+    for w in layout.widgets:
+        fields = tuple(sorted(w.dict(exclude_unset=True).keys() - {"id", "version"}))
+        groups.setdefault(fields, []).append(w)
+    updated = 0
+    for fields, widgets in groups.items():
+        stmt = (
+            update(WidgetModel)
+            .where(WidgetModel.id == bindparam("_id"), WidgetModel.version == bindparam("_version"))
+            .values(version=WidgetModel.version + 1, **{f: bindparam(f) for f in fields})
+            .execution_options(synchronize_session=False)
+        )
+        params = [{"_id": w.id, "_version": w.version, **{f: getattr(w, f) for f in fields}} for w in widgets]
+        result = await db.execute(stmt, params)
+        updated += result.rowcount
+    if updated != len(ids):
+        await db.rollback()
+        result = await db.execute(select(WidgetModel.id, WidgetModel.version).where(WidgetModel.id.in_(ids)))
+        current = dict(result.all())
+        stale = [
+            {"id": w.id, "version": current.get(w.id)}
+            for w in layout.widgets if current.get(w.id) != w.version
+        ]
+        raise HTTPException(status_code=409, detail={"message": "Layout is out of date", "stale": stale})
+    await db.commit()
+    return {"widgets": [{"id": w.id, "version": w.version + 1} for w in layout.widgets]}
+
+def _stale_widget(widget_id, version):
+    """409 in the /layout shape for a write that lost a race with another save."""
+    if version is None:
+        return HTTPException(status_code=404, detail="Widget not found")
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Widget is out of date", "stale": [{"id": widget_id, "version": version}]},
+    )
+
 @router.get("/{widget_id}", response_model=Widget)
-def get_widget(widget_id: int, db: Session = Depends(get_db)):
-    widget = db.query(WidgetModel).filter(WidgetModel.id == widget_id).first()
+async def get_widget(widget_id: int, db: AsyncSession = Depends(get_async_db)):
+    widget = await db.get(WidgetModel, widget_id)
     if not widget:
         raise HTTPException(status_code=404, detail="Widget not found")
     return widget
 
 @router.put("/{widget_id}", response_model=Widget)
-def update_widget(widget_id: int, widget: WidgetUpdate, db: Session = Depends(get_db)):
-    db_widget = db.query(WidgetModel).filter(WidgetModel.id == widget_id).first()
+async def update_widget(widget_id: int, widget: WidgetUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_widget = await db.get(WidgetModel, widget_id)
     if not db_widget:
         raise HTTPException(status_code=404, detail="Widget not found")
     for key, value in widget.dict(exclude_unset=True).items():
         setattr(db_widget, key, value)
-    db.commit()
-    db.refresh(db_widget)
+    try:
+        await db.commit()
+    except StaleDataError:
+        # The version_id_col check failed: a layout save committed since we loaded the row
+        await db.rollback()
+        version = (await db.execute(select(WidgetModel.version).where(WidgetModel.id == widget_id))).scalar()
+        raise _stale_widget(widget_id, version)
+    await db.refresh(db_widget)
     return db_widget
 
 @router.delete("/{widget_id}")
@@ -74,7 +197,12 @@ def delete_widget(widget_id: int, db: Session = Depends(get_db)):
     if not db_widget:
         raise HTTPException(status_code=404, detail="Widget not found")
     db.delete(db_widget)
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        version = db.execute(select(WidgetModel.version).where(WidgetModel.id == widget_id)).scalar()
+        raise _stale_widget(widget_id, version)
     return {"ok": True}
 
 @router.post("/upload")
@@ -1,24 +1,177 @@
 import asyncio
+import threading
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 from app.db.session import engine
 from app.db.models.schedule import Schedule
-from datetime import datetime, timezone
+from app.db.models.scheduler_lease import SchedulerLease
+from app.utils.config import get_config
+from app.utils.logger import get_logger
+from app.utils.recurrence import utcnow, next_run as compute_next_run
+from app.job_queue import WORKER_ID, abandon_orphaned_runs, job_queue, make_job, run_db
+from datetime import timedelta
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = get_logger("schedule_worker")
 
-async def schedule_worker():
+# Fires missed by up to this much (e.g. while the process was down) still run
+MISFIRE_GRACE = timedelta(seconds=float(get_config("SCHEDULE_MISFIRE_GRACE", 300)))
+# Due schedules handled per query
+BATCH_SIZE = int(get_config("SCHEDULE_BATCH_SIZE", 100))
+# Only the process holding this lease dispatches; others take over once it expires.
+# The worker also wakes every LEASE_RENEW seconds, which bounds how long schedule
+# edits made in another process take to be seen.
+LEASE_NAME = "schedule_worker"
+LEASE_TTL = timedelta(seconds=float(get_config("SCHEDULE_LEASE_TTL", 30)))
+LEASE_RENEW = LEASE_TTL.total_seconds() / 3
+
+class ScheduleWakeup:
+    """Lets request threads wake the worker when the set of schedules changes."""
+
+    def __init__(self):
+        self._loop = None
+        self._event = None
+        self._pending = False
+        self._lock = threading.Lock()
+
+    def bind(self, loop):
+        self._loop = loop
+        self._event = asyncio.Event()
+
+    def notify(self):
+        with self._lock:
+            self._pending = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    async def wait(self, timeout):
+        with self._lock:
+            if self._pending:
+                self._pending = False
+                return
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+        with self._lock:
+            self._pending = False
+
+wakeup = ScheduleWakeup()
+
+def notify_schedule_changed(schedule_id=None):
+    """Tell the worker a schedule was created, updated or deleted."""
+    wakeup.notify()
+
+def acquire_lease(db, now, name=LEASE_NAME, ttl=LEASE_TTL):
+    """Take or renew a named lease (the dispatcher's by default); True while this process holds it."""
+    expires_at = now + ttl
+    renewed = (
+        db.query(SchedulerLease)
+        .filter(SchedulerLease.name == name)
+        .filter((SchedulerLease.owner == WORKER_ID) | (SchedulerLease.expires_at < now))
+        .update({"owner": WORKER_ID, "expires_at": expires_at}, synchronize_session=False)
+    )
+    if renewed:
+        db.commit()
+        return True
+    db.add(SchedulerLease(name=name, owner=WORKER_ID, expires_at=expires_at))
+    try:
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+def release_lease(db, name=LEASE_NAME):
+    db.query(SchedulerLease).filter(
+        SchedulerLease.name == name, SchedulerLease.owner == WORKER_ID
+    ).delete(synchronize_session=False)
+    db.commit()
+
+def _claim(db, sched, now):
+    """Atomically move next_run past a due fire; False if another process got there first."""
+    scheduled_for = sched.next_run
+    try:
+        new_next_run = compute_next_run(sched.time, sched.repeat, after=max(now, scheduled_for))
+    except ValueError as e:
+        logger.warning(f"Schedule {sched.id} has invalid time/repeat, disabling: {e}")
+        new_next_run = None
+    claimed = (
+        db.query(Schedule)
+        .filter(Schedule.id == sched.id, Schedule.next_run == scheduled_for)
+        .update({"next_run": new_next_run}, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+def _run(db, sched, now):
+    """Claim a due schedule, then queue its job unless it is too stale."""
+    scheduled_for = sched.next_run
+    if not _claim(db, sched, now):
+        return
+    if scheduled_for < now - MISFIRE_GRACE:
+        logger.warning(f"Schedule {sched.id} ({sched.action}) missed its {scheduled_for} run, skipping")
+        return
+    job_queue.submit(db, make_job(sched, scheduled_for))
+
+def run_due_schedules(db, now):
+    """Fire every schedule with next_run <= now and return the next pending next_run."""
     while True:
-        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
-        with SessionLocal() as db:
-            schedules = db.query(Schedule).all()
-            for sched in schedules:
-                try:
-                    sched_time = datetime.fromisoformat(sched.time)
-                except Exception:
-                    continue
-                if sched_time.replace(second=0, microsecond=0) == now:
-                    try:
-                        sched.trigger(db)
-                    except Exception:
-                        pass
-        await asyncio.sleep(30)
+        due = (
+            db.query(Schedule)
+            .filter(Schedule.next_run <= now)
+            .order_by(Schedule.next_run)
+            .limit(BATCH_SIZE)
+            .all()
+        )
+        for sched in due:
+            _run(db, sched, now)
+        if len(due) < BATCH_SIZE:
+            break
+    return db.query(func.min(Schedule.next_run)).scalar()
+
+def _tick(took_over=False):
+    """One scheduler pass, run on the DB thread pool: renew the lease and fire due schedules.
+
+    took_over is True while this process did not hold the lease on the last
+    pass; on winning it, runs left behind by earlier leaders are abandoned.
+    Returns (is_leader, next pending next_run).
+    """
+    with SessionLocal() as db:
+        now = utcnow()
+        if not acquire_lease(db, now):
+            return False, None
+        if took_over:
+            abandoned = abandon_orphaned_runs(db, now)
+            if abandoned:
+                logger.warning(f"Marked {abandoned} run(s) left by a previous dispatcher as abandoned")
+        return True, run_due_schedules(db, now)
+
+def _release():
+    with SessionLocal() as db:
+        release_lease(db)
+
+async def schedule_worker():
+    wakeup.bind(asyncio.get_running_loop())
+    job_queue.start()
+    leader = False
+    try:
+        while True:
+            next_run = None
+            try:
+                is_leader, next_run = await run_db(_tick, not leader)
+                if is_leader != leader:
+                    logger.info(f"Schedule worker {WORKER_ID} {'acquired' if is_leader else 'lost'} the dispatcher lease")
+                    leader = is_leader
+            except Exception as e:
+                logger.warning(f"Schedule worker iteration failed: {e}")
+            # Wake at least every LEASE_RENEW seconds to renew (or try to take) the lease
+            delay = LEASE_RENEW
+            if next_run is not None:
+                delay = min(max((next_run - utcnow()).total_seconds(), 0), LEASE_RENEW)
+            await wakeup.wait(delay)
+    finally:
+        if leader:
+            await run_db(_release)
@@ -19,4 +19,16 @@ class Category(CategoryBase):
     class Config:
         from_attributes = True
 
-Category.update_forward_refs()
\ No newline at end of file
+Category.update_forward_refs()
+
+class CategoryTreeNode(CategoryBase):
+    id: int
+    order: int
+    item_count: Optional[int] = None
+    children: List['CategoryTreeNode'] = []
+
+CategoryTreeNode.update_forward_refs()
+
+class CategoryBreadcrumb(BaseModel):
+    id: int
+    name: str
\ No newline at end of file
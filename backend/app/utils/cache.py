@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """Bounded LRU cache with per-entry TTL and single-flight loading.
+
+    Concurrent get_or_fetch() calls for the same missing key share one
+    in-flight load instead of each hitting the upstream. get/set/invalidate
+    are also safe to call from threadpool (sync) routes.
+    """
+
+    def __init__(self, ttl=10.0, maxsize=256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, match=None):
+        """Drop every entry whose key satisfies match(key), or all entries."""
+        with self._lock:
+            self._generation += 1
+            if match is None:
+                self._data.clear()
+                return
+            for key in [k for k in self._data if match(k)]:
+                del self._data[key]
+
+    async def get_or_fetch(self, key, fetch):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load(self, key, fetch):
+        generation = self._generation
+        value = await fetch()
+        # Skip caching if an invalidation happened while the load was in flight
+        if value is not None and generation == self._generation:
+            self.set(key, value)
+        return value
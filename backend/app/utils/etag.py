@@ -0,0 +1,22 @@
+from fastapi import Response
+
+def make_etag(*parts):
+    """Strong ETag built from the parts that fully determine a response body."""
+    return '"' + "-".join(str(p) for p in parts) + '"'
+
+def etag_matches(request, etag):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 specifies for If-None-Match
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def not_modified(etag):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def set_etag(response, etag):
+    response.headers["ETag"] = etag
+    # Let browsers keep the body but revalidate on every use
+    response.headers["Cache-Control"] = "no-cache"
@@ -1,26 +1,59 @@
 import httpx
 import logging
+from app.utils.config import get_config
 
-async def safe_get(url, headers=None, params=None, retries=2):
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client = None
+
+def _build_client():
+    limits = httpx.Limits(
+        max_connections=int(get_config("HTTP_MAX_CONNECTIONS", 20)),
+        max_keepalive_connections=int(get_config("HTTP_MAX_KEEPALIVE", 10)),
+        keepalive_expiry=float(get_config("HTTP_KEEPALIVE_EXPIRY", 30)),
+    )
+    return httpx.AsyncClient(limits=limits, http2=HTTP2_AVAILABLE, timeout=10)
+
+def get_client():
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+async def init_http_client():
+    get_client()
+
+async def close_http_client():
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+async def safe_get(url, headers=None, params=None, retries=2, timeout=10):
+    client = get_client()
     for attempt in range(retries + 1):
         try:
-            async with httpx.AsyncClient() as client:
-                r = await client.get(url, headers=headers, params=params, timeout=10)
-                r.raise_for_status()
-                return r.json()
+            r = await client.get(url, headers=headers, params=params, timeout=timeout)
+            r.raise_for_status()
+            return r.json()
         except httpx.HTTPError as e:
             logging.warning(f"[HTTP ERROR] GET {url} failed (attempt {attempt+1}): {e}")
             if hasattr(e, 'response') and e.response is not None:
                 logging.warning(f"[HTTP ERROR] Response body: {e.response.text}")
     return None
 
-async def safe_post(url, headers=None, data=None, json=None, retries=2):
+async def safe_post(url, headers=None, data=None, json=None, retries=2, timeout=10):
+    client = get_client()
     for attempt in range(retries + 1):
         try:
-            async with httpx.AsyncClient() as client:
-                r = await client.post(url, headers=headers, data=data, json=json, timeout=10)
-                r.raise_for_status()
-                return r.json()
+            r = await client.post(url, headers=headers, data=data, json=json, timeout=timeout)
+            r.raise_for_status()
+            return r.json()
         except httpx.HTTPError as e:
             logging.warning(f"[HTTP ERROR] POST {url} failed (attempt {attempt+1}): {e}")
             if hasattr(e, 'response') and e.response is not None:
@@ -0,0 +1,40 @@
+import asyncio
+import time
+from collections import deque
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic sleeper.
+
+    Anything running synchronously on the loop (DB queries, hashing, ...)
+    shows up here as lag, and the same delay is added to every in-flight
+    request on the process.
+    """
+
+    def __init__(self, interval=0.1, window=600):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # lag in ms, newest last
+        self.max_lag_ms = 0.0
+
+    async def run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max((time.perf_counter() - started - self.interval) * 1000, 0.0)
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def stats(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return {"samples": 0, "interval_ms": self.interval * 1000}
+        def pct(p):
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 2)
+        return {
+            "samples": len(samples),
+            "interval_ms": self.interval * 1000,
+            "last_ms": round(self.samples[-1], 2),
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "window_max_ms": round(samples[-1], 2),
+            "max_ms": round(self.max_lag_ms, 2),
+        }
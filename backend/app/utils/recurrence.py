@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+INTERVALS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+ONCE = ("", "once")
+
+def parse_schedule_time(value):
+    """Parse a schedule's ISO time string; naive values are taken as UTC."""
+    try:
+        fire_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if fire_at.tzinfo is None:
+        fire_at = fire_at.replace(tzinfo=timezone.utc)
+    return fire_at
+
+def utcnow():
+    """Naive UTC now, matching how next_run is stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class CronExpression:
+    """Standard 5-field cron expression (minute hour day month weekday), evaluated in UTC.
+
+    Supports '*', lists, ranges and steps. Weekday 0 and 7 are Sunday. As in
+    cron, when both day and weekday are restricted a match on either fires.
+    """
+
+    BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expr!r}")
+        parsed = [self._parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, self.BOUNDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field, lo, hi):
+        values = set()
+        for part in field.split(","):
+            body, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if body == "*":
+                start, end = lo, hi
+            elif "-" in body:
+                start, end = (int(x) for x in body.split("-", 1))
+            else:
+                start = int(body)
+                end = hi if step > 1 else start
+            if step < 1 or start < lo or end > hi or start > end:
+                raise ValueError(f"Invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after):
+        """First matching minute strictly after `after` (naive UTC)."""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError("Cron expression never matches")
+
+def next_run(time_value, repeat, after=None):
+    """Next fire time (naive UTC) for a schedule, or None if it will not fire again.
+
+    `time_value` anchors the recurrence: one-off schedules fire at it, daily
+    and weekly ones at whole intervals from it, and cron ones at the first
+    match not before it. With `after` unset the first occurrence is returned
+    even when it is in the past, so the worker can decide about catch-up.
+    """
+    start = parse_schedule_time(time_value)
+    if start is None:
+        raise ValueError(f"Invalid schedule time: {time_value!r}")
+    start = start.astimezone(timezone.utc).replace(tzinfo=None)
+    repeat = (repeat or "").strip()
+    if repeat in ONCE:
+        return start if after is None or start > after else None
+    if repeat in INTERVALS:
+        interval = INTERVALS[repeat]
+        if after is None or start > after:
+            return start
+        return start + ((after - start) // interval + 1) * interval
+    cron = CronExpression(repeat)
+    first = cron.next_after(start - timedelta(minutes=1))
+    if after is None or first > after:
+        return first
+    return cron.next_after(after)
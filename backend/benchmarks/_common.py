@@ -0,0 +1,86 @@
+"""Setup and timing helpers shared by the benchmark scripts.
+
+Import this before anything from app:
+
+    import _common  # noqa: F401 (sets sys.path and the working directory)
+
+It puts the backend on sys.path and moves into a throwaway directory, since
+app.db.session resolves the default SQLite path against the working
+directory when it creates the engine. The directory is handed down through
+BENCHMARK_WORKDIR, so servers started with serve() use the same database.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+for path in (BACKEND_DIR, BENCHMARKS_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+WORKDIR = os.environ.setdefault("BENCHMARK_WORKDIR", tempfile.mkdtemp(prefix="benchmark-"))
+os.chdir(WORKDIR)
+
+def record_statements(engine):
+    """Return a list that collects the SQL of every statement the engine runs."""
+    from sqlalchemy import event
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def measure(fn, repeat=5, statements=None):
+    """Call fn repeat times; return (its last result, median ms, statements per call).
+
+    The statement count needs a list from record_statements() and is None without one.
+    """
+    timings = []
+    for _ in range(repeat):
+        if statements is not None:
+            statements.clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return result, timings[len(timings) // 2] * 1000, None if statements is None else len(statements)
+
+def percentile(values, p):
+    """The p-th (0-1) percentile of a list of seconds, in ms."""
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000 if values else float("nan")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@contextlib.asynccontextmanager
+async def serve(app, ready_path="/"):
+    """Run uvicorn on "module:attribute" in a subprocess and yield its base URL once it answers."""
+    import httpx
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "PYTHONPATH": os.pathsep.join([BACKEND_DIR, BENCHMARKS_DIR])},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            for _ in range(100):
+                try:
+                    await client.get(ready_path)
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+        yield base_url
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
@@ -0,0 +1,61 @@
+"""Latency of an authenticated request with and without the user cache.
+
+Calls GET /api/v1/users/me in-process through the full dependency chain
+(JWT decode + user lookup) and counts SQL statements per request, then
+times get_current_user() on its own without the HTTP/ASGI overhead.
+Usage: python benchmarks/auth_user_cache.py [requests]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from _common import percentile, record_statements
+from app.core.security import create_access_token
+from _common import percentile, record_statements
+from app.db.base import Base
+from _common import percentile, record_statements
+from app.db.models.users import User
+from _common import percentile, record_statements
+from app.db.session import engine, SessionLocal
+from _common import percentile, record_statements
+from app.routes.deps import get_current_user, user_cache
+from _common import percentile, record_statements
+from app.routes.user import router as user_router
+
+def main(n):
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all(User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x", role="admin")
+                   for i in range(1000))
+        db.commit()
+        user = db.query(User).filter(User.username == "user500").one()
+        token = create_access_token({"sub": user.username, "role": user.role, "user_id": user.id})
+    app = FastAPI()
+    app.include_router(user_router)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {token}"}
+    statements = record_statements(engine)
+    for label, ttl in (("no cache", 0), ("cache", 30)):
+        user_cache.ttl = ttl
+        user_cache.invalidate()
+        client.get("/api/v1/users/me", headers=headers)
+        statements.clear()
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            client.get("/api/v1/users/me", headers=headers).raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        print(f"{label:<9} request     mean {sum(latencies) / n * 1000:6.3f} ms  p50 {percentile(latencies, .5):6.3f} ms"
+              f"  p99 {percentile(latencies, .99):6.3f} ms  {len(statements) / n:.2f} queries/request")
+        start = time.perf_counter()
+        for _ in range(n):
+            with SessionLocal() as db:
+                get_current_user(token, db)
+        print(f"{label:<9} dependency  mean {(time.perf_counter() - start) / n * 1000:6.3f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,67 @@
+"""Latency and query count of POST /api/v1/categories/reorder on a large tree.
+
+Seeds a category tree (default 50k nodes, fan-out 10) and moves two
+nodes, then a whole sibling group, comparing the endpoint with the old
+implementation that loaded and mutated every category through the ORM.
+Usage: python benchmarks/category_reorder.py [categories] [fan-out]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from _common import measure, record_statements
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.session import engine, SessionLocal
+from app.routes.category import router as category_router, build_paths
+from app.routes.deps import get_current_admin_user
+
+def seed(n, fanout):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        parents = {i + 1: (i - 1) // fanout + 1 if i else None for i in range(n)}
+        paths = build_paths(parents, parents)
+        conn.execute(insert(Category), [
+            {"id": id, "name": f"category{id}", "parent_id": parent_id, "order": id % fanout, "path": paths[id]}
+            for id, parent_id in parents.items()
+        ])
+
+def old_reorder(moves):
+    with SessionLocal() as db:
+        cat_map = {item["id"]: item for item in moves}
+        for db_category in db.query(Category).all():
+            item = cat_map.get(db_category.id)
+            if item is not None:
+                db_category.parent_id = item["parent_id"]
+                db_category.order = item["order"]
+        db.commit()
+
+def main(n, fanout):
+    seed(n, fanout)
+    app = FastAPI()
+    app.include_router(category_router)
+    app.dependency_overrides[get_current_admin_user] = lambda: None
+    client = TestClient(app)
+    statements = record_statements(engine)
+
+    def reorder(moves):
+        client.post("/api/v1/categories/reorder", json=moves).raise_for_status()
+    # Swap two deep leaves between parents, then reverse a group of siblings
+    leaf_a, leaf_b = n, n - fanout
+    swap = [
+        {"id": leaf_a, "parent_id": (leaf_b - 2) // fanout + 1, "order": 0},
+        {"id": leaf_b, "parent_id": (leaf_a - 2) // fanout + 1, "order": 0},
+    ]
+    siblings = [{"id": i, "parent_id": 1, "order": fanout - i} for i in range(2, fanout + 2)]
+    for label, moves in (("2 nodes moved", swap), (f"{len(siblings)} siblings reordered", siblings)):
+        _, ms, queries = measure(lambda: reorder(moves), statements=statements)
+        print(f"{label:<24} endpoint {ms:9.2f} ms  {queries:>3} queries")
+        _, ms, queries = measure(lambda: old_reorder(moves), statements=statements)
+        print(f"{label:<24} old      {ms:9.2f} ms  {queries:>3} queries")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,78 @@
+"""Subtree reads and moves with the materialized category path.
+
+Seeds a category tree (default 50k nodes, fan-out 10) with two items per
+category, then for the subtree under node 3, a child of the root, compares:
+  - walking the children backref in Python to collect its subtree items
+  - GET /api/v1/categories/{id}/subtree and /{id}/breadcrumb
+  - a page of GET /api/v1/items/?category_subtree={id}
+and times moving that subtree under another parent.
+Usage: python benchmarks/category_subtree.py [categories] [fan-out]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from _common import measure, record_statements
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.item import Item, item_categories
+from app.db.session import engine, SessionLocal
+from app.routes.api import router as items_router
+from app.routes.category import router as category_router, build_paths
+from app.routes.deps import get_current_admin_user
+
+def seed(n, fanout):
+    Base.metadata.create_all(engine)
+    parents = {i + 1: (i - 1) // fanout + 1 if i else None for i in range(n)}
+    paths = build_paths(parents, parents)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [
+            {"id": id, "name": f"category{id}", "parent_id": parent_id, "order": id % fanout, "path": paths[id]}
+            for id, parent_id in parents.items()
+        ])
+        conn.execute(insert(Item), [{"id": i + 1, "name": f"item{i}", "price": 1} for i in range(n * 2)])
+        conn.execute(insert(item_categories), [{"item_id": i + 1, "category_id": i % n + 1} for i in range(n * 2)])
+
+def walk_subtree_items(category_id):
+    with SessionLocal() as db:
+        stack = [db.query(Category).get(category_id)]
+        item_ids = set()
+        while stack:
+            category = stack.pop()
+            item_ids.update(item.id for item in category.items)
+            stack.extend(category.children)
+        return item_ids
+
+def main(n, fanout):
+    seed(n, fanout)
+    app = FastAPI()
+    app.include_router(category_router)
+    app.include_router(items_router)
+    app.dependency_overrides[get_current_admin_user] = lambda: None
+    client = TestClient(app)
+    statements = record_statements(engine)
+
+    def get(url, **params):
+        client.get(url, params=params).raise_for_status()
+    target = 3
+    for label, fn, repeat in (
+        ("python walk of children", lambda: walk_subtree_items(target), 1),
+        ("subtree endpoint", lambda: get(f"/api/v1/categories/{target}/subtree"), 5),
+        ("subtree + counts", lambda: get(f"/api/v1/categories/{target}/subtree", counts=True), 5),
+        ("items?category_subtree", lambda: get("/api/v1/items/", category_subtree=target), 5),
+        ("breadcrumb of a leaf", lambda: get(f"/api/v1/categories/{n}/breadcrumb"), 5),
+    ):
+        _, ms, queries = measure(fn, repeat, statements)
+        print(f"{label:<26} {ms:9.2f} ms  {queries:>5} queries")
+    moves = iter([2, 4] * 5)
+    def move():
+        client.post("/api/v1/categories/reorder", json=[{"id": target, "parent_id": next(moves), "order": 0}]).raise_for_status()
+    _, ms, queries = measure(move, statements=statements)
+    print(f"{'move the subtree':<26} {ms:9.2f} ms  {queries:>5} queries")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
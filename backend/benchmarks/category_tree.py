@@ -0,0 +1,63 @@
+"""Latency and query count of GET /api/v1/categories/tree.
+
+Seeds a category tree (default 5000 nodes, fan-out 10) with items, then
+compares serializing the roots through the nested Category schema, which
+lazy-loads children and items per node, with the tree endpoint built
+from scratch and served from its cache.
+Usage: python benchmarks/category_tree.py [categories] [fan-out]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from _common import measure, record_statements
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.item import Item, item_categories
+from app.db.session import engine, SessionLocal
+from app.routes.category import router as category_router, build_paths, category_tree_cache
+from app.schemas.categories import Category as CategorySchema
+
+def seed(n, fanout):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        parents = {i + 1: (i - 1) // fanout + 1 if i else None for i in range(n)}
+        paths = build_paths(parents, parents)
+        conn.execute(insert(Category), [
+            {"id": id, "name": f"category{id}", "parent_id": parent_id, "order": id % fanout, "path": paths[id]}
+            for id, parent_id in parents.items()
+        ])
+        conn.execute(insert(Item), [{"id": i + 1, "name": f"item{i}", "price": 1} for i in range(n * 2)])
+        conn.execute(insert(item_categories), [{"item_id": i + 1, "category_id": i % n + 1} for i in range(n * 2)])
+
+def nested_schema():
+    with SessionLocal() as db:
+        roots = db.query(Category).filter(Category.parent_id.is_(None)).all()
+        return [CategorySchema.model_validate(root).model_dump() for root in roots]
+
+def main(n, fanout):
+    seed(n, fanout)
+    app = FastAPI()
+    app.include_router(category_router)
+    client = TestClient(app)
+    statements = record_statements(engine)
+
+    def tree(counts, cached):
+        if not cached:
+            category_tree_cache.invalidate()
+        client.get("/api/v1/categories/tree", params={"counts": counts}).raise_for_status()
+
+    _, ms, queries = measure(nested_schema, 1, statements)
+    print(f"{'nested schema (lazy loads)':<28} {ms:9.2f} ms  {queries:>6} queries")
+    for counts in (False, True):
+        for cached in (False, True):
+            label = f"tree{' + counts' if counts else ''}, {'cached' if cached else 'rebuilt'}"
+            _, ms, queries = measure(lambda: tree(counts, cached), 21, statements)
+            print(f"{label:<28} {ms:9.2f} ms  {queries:>6} queries")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,61 @@
+"""Compare a fresh httpx.AsyncClient per call against the shared pooled client.
+
+Runs against a local stub HTTP server and reports latency and TCP connections opened.
+Usage: python benchmarks/http_pool.py [requests]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from app.utils.http import safe_get, close_http_client
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        StubHandler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        body = json.dumps({"data": [{"id": 1, "name": "rig"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+async def fresh_client_get(url):
+    async with httpx.AsyncClient() as client:
+        r = await client.get(url, timeout=10)
+        return r.json()
+
+async def run(label, fetch, url, n):
+    StubHandler.connections = 0
+    start = time.perf_counter()
+    for _ in range(n):
+        await fetch(url)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {n} requests  {elapsed * 1000 / n:7.3f} ms/req  {StubHandler.connections} connections")
+
+async def main(n):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/farms/1/workers"
+    await run("fresh client", fresh_client_get, url, n)
+    await run("pooled client", safe_get, url, n)
+    await close_http_client()
+    server.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
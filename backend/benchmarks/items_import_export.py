@@ -0,0 +1,94 @@
+"""Throughput and memory of the bulk item import and streaming export.
+
+Writes a catalogue (default 500k items over 200 categories) to NDJSON
+and CSV files, imports each through import_items() as an upload, then
+streams it back out with the export generator. Both are then repeated
+under tracemalloc to report the peak Python heap (RSS would mostly show
+SQLite's page cache and mmap). For comparison, a sample of items is
+created one request at a time through POST /api/v1/items/.
+Usage: python benchmarks/items_import_export.py [items] [sample]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from fastapi import FastAPI, UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.item import Item
+from app.db.session import engine, SessionLocal
+from app.routes.api import router as items_router, import_items, _export_chunks
+
+CATEGORIES = 200
+
+def heap_peak_mb(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+def import_file(name):
+    with open(name, "rb") as f, SessionLocal() as db:
+        return import_items(UploadFile(file=f, filename=name), None, db, None)
+
+def write_files(n):
+    rng = random.Random(7)
+    rows = (
+        {"name": f"item {i}", "description": f"description of item {i}", "price": round(rng.uniform(1, 500), 2),
+         "category_ids": rng.sample(range(1, CATEGORIES + 1), rng.randint(0, 3))}
+        for i in range(n)
+    )
+    with open("items.ndjson", "w") as nd, open("items.csv", "w", newline="") as cs:
+        writer = csv.writer(cs)
+        writer.writerow(("name", "description", "price", "category_ids"))
+        for row in rows:
+            nd.write(json.dumps(row) + "\n")
+            writer.writerow((row["name"], row["description"], row["price"], ";".join(map(str, row["category_ids"]))))
+
+def main(n, sample):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": c + 1, "name": f"category{c}", "path": f"/{c + 1}/"} for c in range(CATEGORIES)])
+    write_files(n)
+    print(f"files: ndjson {os.path.getsize('items.ndjson') / 2**20:.0f} MB, csv {os.path.getsize('items.csv') / 2**20:.0f} MB")
+
+    app = FastAPI()
+    app.include_router(items_router)
+    client = TestClient(app)
+    start = time.perf_counter()
+    with open("items.ndjson") as f:
+        for line in f.readlines()[:sample]:
+            client.post("/api/v1/items/", json=json.loads(line)).raise_for_status()
+    per_item = (time.perf_counter() - start) / sample
+    print(f"one request per item   {per_item * 1000:6.2f} ms/item -> {per_item * n / 60:6.1f} min for {n} items")
+
+    for name in ("items.ndjson", "items.csv"):
+        start = time.perf_counter()
+        result = import_file(name)
+        elapsed = time.perf_counter() - start
+        print(f"import {name:<13}   {elapsed:6.1f} s  {result['imported'] / elapsed:9.0f} items/s")
+    with SessionLocal() as db:
+        total = db.execute(select(func.count(Item.id))).scalar()
+    for format in ("ndjson", "csv"):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in _export_chunks(format))
+        elapsed = time.perf_counter() - start
+        print(f"export {format:<13}   {elapsed:6.1f} s  {total / elapsed:9.0f} items/s  {size / 2**20:.0f} MB")
+    for name in ("items.ndjson", "items.csv"):
+        print(f"import {name:<13}   peak Python heap {heap_peak_mb(lambda: import_file(name)):6.1f} MB")
+    for format in ("ndjson", "csv"):
+        peak = heap_peak_mb(lambda: sum(len(chunk) for chunk in _export_chunks(format)))
+        print(f"export {format:<13}   peak Python heap {peak:6.1f} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000, int(sys.argv[2]) if len(sys.argv) > 2 else 500)
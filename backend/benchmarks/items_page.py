@@ -0,0 +1,63 @@
+"""Query count and latency of one page of GET /api/v1/items/.
+
+Seeds 100k items spread over 50 categories (two each), then requests a
+page through the API and compares it with the old path: loading every
+item and lazy-loading each item's categories (N+1).
+Usage: python benchmarks/items_page.py [items] [page size]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import sys
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from _common import measure, record_statements
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.item import Item, item_categories
+from app.db.session import engine, SessionLocal
+from app.routes.api import router as items_router
+from app.schemas.catalogue.items import ItemRead
+
+CATEGORIES = 50
+
+def seed(n):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": c + 1, "name": f"category{c}"} for c in range(CATEGORIES)])
+        conn.execute(insert(Item), [{"id": i + 1, "name": f"item{i}", "price": i % 100} for i in range(n)])
+        conn.execute(insert(item_categories), [
+            {"item_id": i + 1, "category_id": (i + k) % CATEGORIES + 1} for i in range(n) for k in (0, 7)
+        ])
+
+def old_list_items():
+    with SessionLocal() as db:
+        return [ItemRead.from_orm_with_categories(item) for item in db.query(Item).all()]
+
+def main(n, limit):
+    seed(n)
+    app = FastAPI()
+    app.include_router(items_router)
+    client = TestClient(app)
+    statements = record_statements(engine)
+
+    def page(**params):
+        r = client.get("/api/v1/items/", params={"limit": limit, **params})
+        r.raise_for_status()
+        return r
+    mid = str(n // 2)
+    for label, fn in (
+        ("first page", lambda: page()),
+        ("middle page", lambda: page(after_id=mid)),
+        ("category page", lambda: page(category_id=3)),
+        ("category, middle", lambda: page(category_id=3, after_id=mid)),
+    ):
+        r, ms, queries = measure(fn, statements=statements)
+        print(f"{label:<17} {len(r.json()):>6} items  {ms:8.2f} ms  {queries:>6} queries")
+    items, ms, queries = measure(old_list_items, 1, statements)
+    print(f"{'old: all + N+1':<17} {len(items):>6} items  {ms:8.2f} ms  {queries:>6} queries")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000, int(sys.argv[2]) if len(sys.argv) > 2 else 100)
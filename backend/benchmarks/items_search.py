@@ -0,0 +1,86 @@
+"""Latency of GET /api/v1/items/search on a large catalogue.
+
+Seeds items (default 1M) whose names and descriptions are drawn from a
+synthetic vocabulary with a long-tailed word frequency, spread over 200
+categories, builds the FTS5 index, then times first pages for rare,
+common, prefix and multi-word queries through the API, noting whether
+each was ranked by bm25 or was too common and listed name matches first.
+Usage: python benchmarks/items_search.py [items]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import random
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from _common import measure
+from app.db.base import Base
+from app.db.models.category import Category
+from app.db.models.item import Item, item_categories
+from app.db.search import rebuild_search_index
+from app.db.session import engine
+from app.routes.api import router as items_router
+
+CATEGORIES = 200
+BATCH = 50_000
+
+def word(i):
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    letters = []
+    for _ in range(3):
+        letters += [consonants[i % 16], vowels[i // 16 % 5]]
+        i //= 80
+    return "".join(letters)
+
+def seed(n):
+    rng = random.Random(42)
+    vocabulary = [word(i) for i in range(20_000)]
+    # Zipf-like: word k is drawn with weight 1 / (k + 1)
+    weights = [1 / (k + 1) for k in range(len(vocabulary))]
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": c + 1, "name": f"{vocabulary[c * 7]} category", "path": f"/{c + 1}/"}
+                                        for c in range(CATEGORIES)])
+        for start in range(0, n, BATCH):
+            ids = range(start + 1, min(start + BATCH, n) + 1)
+            words = rng.choices(vocabulary, weights, k=len(ids) * 12)
+            conn.execute(insert(Item), [
+                {"id": id, "name": " ".join(words[k * 12:k * 12 + 3]), "description": " ".join(words[k * 12 + 3:k * 12 + 12]),
+                 "price": id % 100}
+                for k, id in enumerate(ids)
+            ])
+            conn.execute(insert(item_categories), [{"item_id": id, "category_id": id % CATEGORIES + 1} for id in ids])
+        start = time.perf_counter()
+        rebuild_search_index(conn)
+        print(f"indexed {n} items in {time.perf_counter() - start:.1f} s")
+    return vocabulary
+
+def main(n):
+    vocabulary = seed(n)
+    app = FastAPI()
+    app.include_router(items_router)
+    client = TestClient(app)
+    queries = (
+        ("rare word", vocabulary[15_000]),
+        ("mid-frequency word", vocabulary[500]),
+        ("common word", vocabulary[3]),
+        ("most common word", vocabulary[0]),
+        ("two words", f"{vocabulary[40]} {vocabulary[90]}"),
+        ("prefix", vocabulary[1200][:4]),
+        ("short prefix", vocabulary[0][:2]),
+        ("category name", f"{vocabulary[14]} category"),
+        ("page 10 of a common word", vocabulary[3]),
+    )
+    for label, q in queries:
+        params = {"q": q, "limit": 20, "offset": 180 if label.startswith("page") else 0}
+        r, ms, _ = measure(lambda: client.get("/api/v1/items/search", params=params), 11)
+        r.raise_for_status()
+        order = "name, newest" if r.headers.get("X-Search-Approximate") else "bm25"
+        print(f"{label:<26} {q!r:<22} p50 {ms:7.2f} ms  {len(r.json()):>3} results  {order}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
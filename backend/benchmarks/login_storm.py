@@ -0,0 +1,106 @@
+"""Widget list latency during a login storm: bcrypt on the threadpool vs the process pool.
+
+Serves each variant with uvicorn in a subprocess. A probe requests
+GET /api/v1/widgets/ back to back while a batch of concurrent logins runs;
+the "threadpool" variant is the previous sync login route, kept here for
+comparison. Both use BCRYPT_ROUNDS (default 12).
+Usage: python benchmarks/login_storm.py [logins] [concurrency]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from _common import percentile, serve
+from app.core.security import create_access_token, get_password_hash, verify_password, shutdown_password_pool
+from _common import percentile, serve
+from app.db.models.users import User
+from _common import percentile, serve
+from app.db.session import async_engine, get_db
+from _common import percentile, serve
+from app.routes.user import router as user_router
+from _common import percentile, serve
+from app.routes.widgets import router as widgets_router
+from _common import percentile, serve
+from app.schemas.users import UserLogin
+
+pool_app = FastAPI()
+pool_app.include_router(user_router)
+pool_app.include_router(widgets_router)
+
+@pool_app.on_event("shutdown")
+async def pool_app_shutdown():
+    shutdown_password_pool()
+    await async_engine.dispose()
+
+threadpool_app = FastAPI()
+threadpool_app.include_router(widgets_router)
+
+@threadpool_app.post("/api/v1/users/login")
+def threadpool_login(user: UserLogin, db: Session = Depends(get_db)):
+    db_user = db.query(User).filter(User.username == user.username).first()
+    if not db_user or not verify_password(user.password, db_user.hashed_password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    token = create_access_token({"sub": db_user.username, "role": db_user.role, "user_id": db_user.id})
+    return {"access_token": token, "token_type": "bearer"}
+
+@threadpool_app.on_event("shutdown")
+async def threadpool_app_shutdown():
+    await async_engine.dispose()
+
+def seed():
+    from app.db.base import Base
+    from app.db.models.widget import Widget
+    from app.db.session import engine, SessionLocal
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add(User(username="admin", email="admin@example.com", hashed_password=get_password_hash("admin"), role="admin"))
+        db.add_all(Widget(type="clock", enabled=True, config={}, pos={"x": i}, size={"w": 2}) for i in range(30))
+        db.commit()
+
+async def probe(client, latencies, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        (await client.get("/api/v1/widgets/")).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+async def storm(client, logins, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one():
+        async with semaphore:
+            (await client.post("/api/v1/users/login", json={"username": "admin", "password": "admin"})).raise_for_status()
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start
+
+async def load(label, app_name, logins, concurrency):
+    async with serve(f"login_storm:{app_name}", "/api/v1/widgets/") as base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            # Warm up (starts the password pool workers)
+            await storm(client, 2, 2)
+            for phase in ("idle", "storm"):
+                latencies, stop = [], asyncio.Event()
+                task = asyncio.create_task(probe(client, latencies, stop))
+                if phase == "idle":
+                    await asyncio.sleep(2)
+                    extra = ""
+                else:
+                    elapsed = await storm(client, logins, concurrency)
+                    extra = f"  {logins / elapsed:5.1f} logins/s"
+                stop.set()
+                await task
+                print(f"{label:<10} {phase:<5} widgets p50 {percentile(latencies, .5):7.1f} ms"
+                      f"  p99 {percentile(latencies, .99):7.1f} ms  max {percentile(latencies, 1):7.1f} ms{extra}")
+
+if __name__ == "__main__":
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seed()
+    asyncio.run(load("threadpool", "threadpool_app", logins, concurrency))
+    asyncio.run(load("process", "pool_app", logins, concurrency))
@@ -0,0 +1,98 @@
+"""Settings read round trip: legacy text columns vs native JSON columns.
+
+Each iteration opens a session, loads the settings row and builds the
+public payload, with the in-process settings cache bypassed. The legacy
+variant reproduces the old Text/CSV schema and its parsing heuristics.
+Usage: python benchmarks/settings_roundtrip.py [iterations]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import json
+import sys
+import time
+
+from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.db.base import Base
+from app.db.models.settings import Settings
+from app.db.models.table_version import TableVersion
+from app.db.session import make_engine
+from app.routes.settings import parse_settings
+
+LegacyBase = declarative_base()
+
+class LegacySettings(LegacyBase):
+    __tablename__ = "settings"
+    id = Column(Integer, primary_key=True, index=True)
+    languages = Column(String, nullable=False, default="en")
+    site_name = Column(Text, nullable=False)
+    site_content = Column(Text, nullable=True)
+    menu = Column(Text, nullable=True)
+
+def legacy_parse_settings(settings):
+    def parse_json_field(val, default):
+        if val is None or val == "":
+            return default
+        if isinstance(val, dict) or isinstance(val, list):
+            return val
+        try:
+            return json.loads(val)
+        except Exception:
+            return default
+    langs = settings.languages
+    if isinstance(langs, list):
+        languages = langs
+    elif isinstance(langs, str):
+        if langs.strip().startswith("["):
+            try:
+                languages = json.loads(langs)
+            except Exception:
+                languages = [l.strip() for l in langs.split(",") if l.strip()]
+        else:
+            languages = [l.strip() for l in langs.split(",") if l.strip()]
+    else:
+        languages = ["en"]
+    return {
+        "languages": languages,
+        "siteName": parse_json_field(settings.site_name, {"en": ""}),
+        "siteContent": parse_json_field(settings.site_content, {"en": ""}),
+        "menu": parse_json_field(settings.menu, []),
+    }
+
+LANGUAGES = ["en", "bg", "de", "fr"]
+SITE_NAME = {lang: "Global Virtual Display" for lang in LANGUAGES}
+SITE_CONTENT = {lang: "<p>Welcome</p>" * 50 for lang in LANGUAGES}
+MENU = [
+    {"id": i, "label": {lang: f"Item {i}" for lang in LANGUAGES}, "route": f"/page/{i}", "visibility": "public",
+     "children": [{"id": i * 100 + j, "label": {lang: f"Sub {j}" for lang in LANGUAGES}, "route": f"/page/{i}/{j}",
+                   "visibility": "public", "children": []} for j in range(4)]}
+    for i in range(20)
+]
+
+def run(label, base, model, row, parse, n):
+    engine = make_engine(f"sqlite:///./{label}.db")
+    base.metadata.create_all(engine)
+    TableVersion.__table__.create(engine, checkfirst=True)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(model(**row))
+        db.commit()
+    start = time.perf_counter()
+    for _ in range(n):
+        with Session() as db:
+            payload = parse(db.query(model).first())
+    elapsed = time.perf_counter() - start
+    assert payload["menu"][0]["route"] == "/page/0"
+    print(f"{label:<7} {elapsed * 1e6 / n:8.1f} us/read")
+    engine.dispose()
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    run("legacy", LegacyBase, LegacySettings, {
+        "languages": ",".join(LANGUAGES), "site_name": json.dumps(SITE_NAME),
+        "site_content": json.dumps(SITE_CONTENT), "menu": json.dumps(MENU),
+    }, legacy_parse_settings, n)
+    run("json", Base, Settings, {
+        "languages": LANGUAGES, "site_name": SITE_NAME, "site_content": SITE_CONTENT, "menu": MENU,
+    }, parse_settings, n)
@@ -0,0 +1,78 @@
+"""Concurrent widget reads and layout writes against SQLite, bare engine vs the tuned one.
+
+Each profile gets its own database file in a temp directory, seeded with
+widgets. Reader threads list all widgets while writer threads update a
+random widget's position and commit, for a fixed duration.
+Usage: python benchmarks/sqlite_concurrency.py [seconds] [readers] [writers]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from _common import percentile
+from app.db.base import Base
+from _common import percentile
+from app.db.models import Widget
+from _common import percentile
+from app.db.session import make_engine
+
+WIDGETS = 200
+
+def seed(engine):
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add_all(Widget(type="clock", pos={"x": i, "y": 0}, size={"w": 2, "h": 2}) for i in range(WIDGETS))
+        db.commit()
+
+def worker(Session, write, deadline, stats):
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with Session() as db:
+                if write:
+                    widget = db.query(Widget).get(random.randint(1, WIDGETS))
+                    widget.pos = {"x": random.randint(0, 20), "y": random.randint(0, 20)}
+                    db.commit()
+                else:
+                    db.query(Widget).all()
+        except OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    stats.append((write, latencies, errors))
+
+def run(label, engine, seconds, readers, writers):
+    seed(engine)
+    Session = sessionmaker(bind=engine)
+    stats = []
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=worker, args=(Session, i < writers, deadline, stats))
+               for i in range(readers + writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for write, kind in ((False, "reads"), (True, "writes")):
+        lat = [l for w, ls, _ in stats if w == write for l in ls]
+        errors = sum(e for w, _, e in stats if w == write)
+        print(f"{label:<6} {kind:<6} {len(lat) / seconds:8.0f} ops/s  p50 {percentile(lat, .5):7.2f} ms"
+              f"  p99 {percentile(lat, .99):8.2f} ms  locked errors {errors}")
+    engine.dispose()
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    # What db/session.py used to build: default journal, NullPool, 5 s driver timeout
+    bare = create_engine("sqlite:///./bare.db", connect_args={"check_same_thread": False})
+    run("bare", bare, seconds, readers, writers)
+    run("tuned", make_engine("sqlite:///./tuned.db"), seconds, readers, writers)
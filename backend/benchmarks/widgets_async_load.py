@@ -0,0 +1,99 @@
+"""Load test the display's widget endpoints: sync threadpool routes vs the async ones.
+
+Serves each variant with uvicorn in a subprocess against the same seeded
+SQLite file and drives it with a mix of list, get and update requests.
+The sync variant is the pre-async implementation kept here for comparison.
+Usage: python benchmarks/widgets_async_load.py [requests] [concurrency]
+"""
+import _common  # noqa: F401 (sets sys.path and the working directory)
+
+import asyncio
+import random
+import sys
+import time
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from _common import percentile, serve
+from app.db.models.widget import Widget as WidgetModel
+from _common import percentile, serve
+from app.db.session import get_db
+from _common import percentile, serve
+from app.routes.widgets import Widget, WidgetUpdate, router as widgets_router
+
+WIDGETS = 30
+
+async_app = FastAPI()
+async_app.include_router(widgets_router)
+
+sync_app = FastAPI()
+
+@sync_app.get("/api/v1/widgets/", response_model=List[Widget])
+def sync_list_widgets(db: Session = Depends(get_db)):
+    return db.query(WidgetModel).all()
+
+@sync_app.get("/api/v1/widgets/{widget_id}", response_model=Widget)
+def sync_get_widget(widget_id: int, db: Session = Depends(get_db)):
+    widget = db.query(WidgetModel).filter(WidgetModel.id == widget_id).first()
+    if not widget:
+        raise HTTPException(status_code=404, detail="Widget not found")
+    return widget
+
+@sync_app.put("/api/v1/widgets/{widget_id}", response_model=Widget)
+def sync_update_widget(widget_id: int, widget: WidgetUpdate, db: Session = Depends(get_db)):
+    db_widget = db.query(WidgetModel).filter(WidgetModel.id == widget_id).first()
+    if not db_widget:
+        raise HTTPException(status_code=404, detail="Widget not found")
+    for key, value in widget.dict(exclude_unset=True).items():
+        setattr(db_widget, key, value)
+    db.commit()
+    db.refresh(db_widget)
+    return db_widget
+
+def seed():
+    from app.db.base import Base
+    from app.db.session import engine, SessionLocal
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        db.add_all(WidgetModel(type="clock", enabled=True, config={"format": "HH:mm"},
+                               pos={"x": i, "y": 0}, size={"w": 2, "h": 2}) for i in range(WIDGETS))
+        db.commit()
+
+async def request(client, latencies):
+    widget_id = random.randint(1, WIDGETS)
+    roll = random.random()
+    start = time.perf_counter()
+    if roll < 0.5:
+        r = await client.get("/api/v1/widgets/")
+    elif roll < 0.9:
+        r = await client.get(f"/api/v1/widgets/{widget_id}")
+    else:
+        r = await client.put(f"/api/v1/widgets/{widget_id}", json={
+            "type": "clock", "enabled": True, "pos": {"x": random.randint(0, 20), "y": 0}})
+    r.raise_for_status()
+    latencies.append(time.perf_counter() - start)
+
+async def load(label, app_name, n, concurrency):
+    async with serve(f"widgets_async_load:{app_name}", "/api/v1/widgets/") as base_url:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            latencies = []
+            semaphore = asyncio.Semaphore(concurrency)
+            async def one():
+                async with semaphore:
+                    await request(client, latencies)
+            start = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(n)))
+            elapsed = time.perf_counter() - start
+        print(f"{label:<6} {n / elapsed:8.0f} req/s  p50 {percentile(latencies, .5):7.1f} ms"
+              f"  p99 {percentile(latencies, .99):7.1f} ms")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    seed()
+    asyncio.run(load("sync", "sync_app", n, concurrency))
+    asyncio.run(load("async", "async_app", n, concurrency))
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+# app.db.session creates its engines on import, so point them at a throwaway database first
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.db.models  # noqa: F401 (registers every table)
+from app.db.base import Base
+from app.db.session import async_engine, engine, SessionLocal
+from app.routes.category import category_tree_cache
+from app.routes.deps import get_current_admin_user
+
+@pytest.fixture(autouse=True)
+def tables():
+    """Fresh tables (and items_fts) for every test."""
+    Base.metadata.create_all(engine)
+    category_tree_cache.invalidate()
+    yield
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+@pytest.fixture
+def client():
+    """Return a factory for TestClients serving the given routers, with admin checks bypassed.
+
+    As in app.main, the async engine is disposed on shutdown: its pooled
+    connections belong to the client's event loop and their threads would
+    otherwise keep the interpreter alive.
+    """
+    clients = []
+
+    def make(*routers):
+        app = FastAPI()
+        for router in routers:
+            app.include_router(router)
+        app.dependency_overrides[get_current_admin_user] = lambda: None
+        app.add_event_handler("shutdown", async_engine.dispose)
+        test_client = TestClient(app)
+        test_client.__enter__()
+        clients.append(test_client)
+        return test_client
+
+    yield make
+    for test_client in clients:
+        test_client.__exit__(None, None, None)
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.utils.cache import TTLCache
+
+def test_concurrent_misses_share_one_fetch():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rigs": []}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("farm:1", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.get("farm:1") == {"rigs": []}
+
+def test_invalidation_during_fetch_skips_caching():
+    cache = TTLCache(ttl=60)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def fetch():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        task = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        await started.wait()
+        cache.invalidate()
+        return await task
+
+    assert asyncio.run(main()) == "stale"
+    assert cache.get("key") is None
+
+def test_invalidate_matching_keys_only():
+    cache = TTLCache(ttl=60)
+    cache.set(("farm", 1), "a")
+    cache.set(("farm", 2), "b")
+    cache.invalidate(lambda key: key[1] == 1)
+    assert cache.get(("farm", 1)) is None
+    assert cache.get(("farm", 2)) == "b"
+
+def test_expired_and_evicted_entries_are_dropped():
+    cache = TTLCache(ttl=-1)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+    cache = TTLCache(ttl=60, maxsize=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
@@ -0,0 +1,54 @@
+from app.db.models.category import Category
+from app.routes.category import router as category_router
+
+def seed(db, parents):
+    """Create categories {id: parent_id} (parents listed first) with their paths."""
+    paths = {}
+    for id, parent_id in parents.items():
+        paths[id] = f"{paths[parent_id] if parent_id else '/'}{id}/"
+        db.add(Category(id=id, name=f"category{id}", parent_id=parent_id, order=0, path=paths[id]))
+    db.commit()
+
+def stored(db):
+    db.expire_all()
+    return {c.id: (c.parent_id, c.path) for c in db.query(Category)}
+
+# 1 -> 2 -> 3 and a second root 4
+TREE = {1: None, 2: 1, 3: 2, 4: None}
+
+def test_reorder_rewrites_subtree_paths(client, db):
+    seed(db, TREE)
+    r = client(category_router).post("/api/v1/categories/reorder", json=[{"id": 2, "parent_id": 4, "order": 0}])
+    assert r.status_code == 204
+    assert stored(db) == {1: (None, "/1/"), 2: (4, "/4/2/"), 3: (2, "/4/2/3/"), 4: (None, "/4/")}
+
+def test_reorder_moves_nested_moves_together(client, db):
+    seed(db, TREE)
+    r = client(category_router).post("/api/v1/categories/reorder", json=[
+        {"id": 3, "parent_id": None, "order": 0},
+        {"id": 1, "parent_id": 3, "order": 0},
+    ])
+    assert r.status_code == 204
+    assert stored(db) == {3: (None, "/3/"), 1: (3, "/3/1/"), 2: (1, "/3/1/2/"), 4: (None, "/4/")}
+
+def test_reorder_rejects_cycles(client, db):
+    seed(db, TREE)
+    c = client(category_router)
+    r = c.post("/api/v1/categories/reorder", json=[{"id": 1, "parent_id": 3, "order": 0}])
+    assert r.status_code == 400
+    assert "own ancestor" in r.json()["detail"]
+    r = c.post("/api/v1/categories/reorder", json=[{"id": 2, "parent_id": 2, "order": 0}])
+    assert r.status_code == 400
+    assert stored(db) == {1: (None, "/1/"), 2: (1, "/1/2/"), 3: (2, "/1/2/3/"), 4: (None, "/4/")}
+
+def test_reorder_rejects_unknown_ids(client, db):
+    seed(db, TREE)
+    c = client(category_router)
+    assert c.post("/api/v1/categories/reorder", json=[{"id": 99, "parent_id": None, "order": 0}]).status_code == 404
+    assert c.post("/api/v1/categories/reorder", json=[{"id": 1, "parent_id": 99, "order": 0}]).status_code == 400
+
+def test_update_rejects_moving_under_a_descendant(client, db):
+    seed(db, TREE)
+    r = client(category_router).put("/api/v1/categories/1", json={"name": "category1", "parent_id": 3})
+    assert r.status_code == 400
+    assert stored(db)[1] == (None, "/1/")
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.hiveos_poller import FarmHub
+
+def rig(id, status="on"):
+    return {"id": id, "name": f"rig{id}", "status": status}
+
+def make_hub(**kwargs):
+    hub = FarmHub(**kwargs)
+    hub.track({"1": {}})
+    return hub
+
+def test_delta_since_a_version_lists_only_changes():
+    hub = make_hub()
+    first = hub.publish(1, [rig(1), rig(2)])
+    second = hub.publish(1, [rig(1, "off"), rig(3)])
+    assert hub.delta(1, second) is None
+    delta = hub.delta(1, first)
+    assert delta["type"] == "diff"
+    assert delta["version"] == second
+    assert delta["added"] == [rig(3)]
+    assert delta["changed"] == [rig(1, "off")]
+    assert delta["removed"] == ["2"]
+
+def test_unchanged_publish_keeps_the_version():
+    hub = make_hub()
+    version = hub.publish(1, [rig(1)])
+    assert hub.publish(1, [rig(1)]) == version
+
+def test_foreign_or_malformed_tokens_get_a_snapshot():
+    hub = make_hub()
+    version = hub.publish(1, [rig(1)])
+    other = make_hub()
+    other.publish(1, [rig(1)])
+    assert other.version_token(1) != version
+    for token in (other.version_token(1), "garbage", None):
+        assert hub.delta(1, token) == {"type": "snapshot", "version": version, "rigs": [rig(1)]}
+
+def test_tokens_older_than_the_tombstone_horizon_get_a_snapshot():
+    hub = make_hub(max_tombstones=1)
+    first = hub.publish(1, [rig(1), rig(2), rig(3)])
+    hub.publish(1, [rig(1), rig(2)])
+    hub.publish(1, [rig(1)])
+    assert hub.delta(1, first)["type"] == "snapshot"
+
+def test_untracked_farms_are_not_stored():
+    hub = make_hub()
+    assert hub.publish(2, [rig(1)]) is None
+    assert "2" not in hub.workers
+    hub.publish(1, [rig(1)])
+    hub.track({"3": {}})
+    assert "1" not in hub.workers and "1" not in hub.versions
+
+def test_subscribers_receive_diffs():
+    hub = make_hub()
+    hub.publish(1, [rig(1)])
+
+    async def main():
+        queue = hub.subscribe(1)
+        hub.publish(1, [rig(1), rig(2)])
+        return queue.get_nowait()
+
+    event = asyncio.run(main())
+    assert event["type"] == "diff"
+    assert event["added"] == [rig(2)]
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.db.models.category import Category
+from app.db.models.item import Item
+from app.routes.api import router as items_router
+
+ROWS = [
+    {"name": "Pump", "description": "Cast iron", "price": 12.5, "category_ids": [1, 2]},
+    {"name": "Valve, brass", "description": None, "price": 3.0, "category_ids": []},
+    {"name": "Hose \"heavy\"", "description": "line one\nline two", "price": 7.25, "category_ids": [2]},
+]
+
+@pytest.fixture
+def items_client(client, db):
+    db.add_all([Category(id=1, name="pumps", path="/1/"), Category(id=2, name="parts", path="/2/")])
+    db.commit()
+    return client(items_router)
+
+def export(c, format):
+    r = c.get("/api/v1/items/export", params={"format": format})
+    assert r.status_code == 200
+    return r.content
+
+def import_file(c, name, content):
+    r = c.post("/api/v1/items/import", files={"file": (name, content)})
+    assert r.status_code == 200
+    return r.json()
+
+def stored_items(db):
+    return [
+        {"name": i.name, "description": i.description, "price": i.price, "category_ids": sorted(c.id for c in i.categories)}
+        for i in db.query(Item).order_by(Item.id)
+    ]
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_export_then_import_round_trips(items_client, db, format):
+    ndjson = "".join(json.dumps(row) + "\n" for row in ROWS)
+    assert import_file(items_client, "items.ndjson", ndjson) == {"imported": 3, "failed": 0, "errors": []}
+    assert stored_items(db) == ROWS
+
+    exported = export(items_client, format)
+    assert import_file(items_client, f"items.{format}", exported)["imported"] == 3
+    db.expire_all()
+    assert stored_items(db) == ROWS + ROWS
+    ids = [item.id for item in db.query(Item).order_by(Item.id)]
+    assert ids == list(range(1, 7))
+
+def test_export_formats(items_client):
+    import_file(items_client, "items.ndjson", "".join(json.dumps(row) + "\n" for row in ROWS))
+    lines = export(items_client, "ndjson").decode().splitlines()
+    assert [json.loads(line) for line in lines] == [dict(row, id=i) for i, row in enumerate(ROWS, 1)]
+    rows = list(csv.DictReader(io.StringIO(export(items_client, "csv").decode())))
+    assert [row["category_ids"] for row in rows] == ["1;2", "", "2"]
+
+def test_invalid_rows_are_skipped_and_reported(items_client, db):
+    content = "\n".join([
+        json.dumps({"name": "ok", "price": 1}),
+        json.dumps({"name": "no price"}),
+        "not json",
+        json.dumps({"name": "bad category", "price": 1, "category_ids": [99]}),
+    ])
+    result = import_file(items_client, "items.jsonl", content)
+    assert result["imported"] == 1 and result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [2, 3, 4]
+    assert "99" in result["errors"][2]["error"]
+    assert [item["name"] for item in stored_items(db)] == ["ok"]
+
+def test_unknown_format_is_rejected(items_client):
+    r = items_client.post("/api/v1/items/import", files={"file": ("items.xml", "<items/>")})
+    assert r.status_code == 400
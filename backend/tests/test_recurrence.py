@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils.recurrence import CronExpression, next_run
+
+START = "2026-01-05T08:30:00"  # a Monday
+
+def test_once_fires_at_its_time_until_it_has_passed():
+    assert next_run(START, "") == datetime(2026, 1, 5, 8, 30)
+    assert next_run(START, "once", after=datetime(2026, 1, 5, 8, 0)) == datetime(2026, 1, 5, 8, 30)
+    assert next_run(START, "once", after=datetime(2026, 1, 5, 8, 30)) is None
+
+def test_daily_and_weekly_keep_their_anchor():
+    after = datetime(2026, 1, 20, 9, 0)
+    assert next_run(START, "daily", after=after) == datetime(2026, 1, 21, 8, 30)
+    assert next_run(START, "weekly", after=after) == datetime(2026, 1, 26, 8, 30)
+    assert next_run(START, "daily", after=datetime(2026, 1, 21, 8, 30)) == datetime(2026, 1, 22, 8, 30)
+
+def test_time_zone_offsets_are_converted_to_utc():
+    assert next_run("2026-01-05T10:30:00+02:00", "") == datetime(2026, 1, 5, 8, 30)
+
+def test_cron_first_match_is_not_before_the_anchor():
+    assert next_run(START, "*/15 * * * *") == datetime(2026, 1, 5, 8, 30)
+    assert next_run(START, "0 9 * * 1-5", after=datetime(2026, 1, 9, 9, 0)) == datetime(2026, 1, 12, 9, 0)
+
+@pytest.mark.parametrize("expr, after, expected", [
+    ("0 0 1 * *", datetime(2026, 1, 31, 12, 0), datetime(2026, 2, 1, 0, 0)),
+    ("30 6 * 3 *", datetime(2026, 1, 1), datetime(2026, 3, 1, 6, 30)),
+    ("0 12 * * 0", datetime(2026, 1, 5), datetime(2026, 1, 11, 12, 0)),
+    ("0 12 * * 7", datetime(2026, 1, 5), datetime(2026, 1, 11, 12, 0)),
+    # Day and weekday both restricted: either one matching fires
+    ("0 0 13 * 5", datetime(2026, 1, 5), datetime(2026, 1, 9, 0, 0)),
+])
+def test_cron_next_after(expr, after, expected):
+    assert CronExpression(expr).next_after(after) == expected
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *"])
+def test_invalid_cron_expressions(expr):
+    with pytest.raises(ValueError):
+        CronExpression(expr)
+
+def test_invalid_time():
+    with pytest.raises(ValueError):
+        next_run("tomorrow", "daily")
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from app import schedule_worker
+from app.db.models.schedule_run import ScheduleRun
+from app.db.models.scheduler_lease import SchedulerLease
+from app.job_queue import WORKER_ID
+from app.schedule_worker import LEASE_NAME, LEASE_TTL, acquire_lease, release_lease
+from app.utils.recurrence import utcnow
+
+OTHER = "otherhost:1:deadbeef"
+
+def lease_owner(db):
+    db.expire_all()
+    lease = db.get(SchedulerLease, LEASE_NAME)
+    return lease and (lease.owner, lease.expires_at)
+
+def test_first_process_takes_and_renews_the_lease(db):
+    now = utcnow()
+    assert acquire_lease(db, now)
+    assert lease_owner(db) == (WORKER_ID, now + LEASE_TTL)
+    later = now + timedelta(seconds=5)
+    assert acquire_lease(db, later)
+    assert lease_owner(db) == (WORKER_ID, later + LEASE_TTL)
+
+def test_live_lease_of_another_process_is_respected(db):
+    now = utcnow()
+    db.add(SchedulerLease(name=LEASE_NAME, owner=OTHER, expires_at=now + timedelta(seconds=10)))
+    db.commit()
+    assert not acquire_lease(db, now)
+    assert lease_owner(db)[0] == OTHER
+    # Releasing only drops a lease this process holds
+    release_lease(db)
+    assert lease_owner(db)[0] == OTHER
+
+def test_expired_lease_is_taken_over(db):
+    now = utcnow()
+    db.add(SchedulerLease(name=LEASE_NAME, owner=OTHER, expires_at=now - timedelta(seconds=1)))
+    db.commit()
+    assert acquire_lease(db, now)
+    assert lease_owner(db) == (WORKER_ID, now + LEASE_TTL)
+    release_lease(db)
+    assert lease_owner(db) is None
+
+def test_leases_are_independent_by_name(db):
+    now = utcnow()
+    db.add(SchedulerLease(name=LEASE_NAME, owner=OTHER, expires_at=now + timedelta(seconds=10)))
+    db.commit()
+    assert acquire_lease(db, now, name="hiveos_poller")
+
+def test_takeover_abandons_runs_left_by_the_previous_leader(db):
+    now = utcnow()
+    db.add(SchedulerLease(name=LEASE_NAME, owner=OTHER, expires_at=now - timedelta(seconds=1)))
+    for status, owner in (("queued", OTHER), ("running", None), ("ok", OTHER), ("running", WORKER_ID)):
+        db.add(ScheduleRun(schedule_id=1, widget_id=1, action="enable", status=status, owner=owner, queued_at=now))
+    db.commit()
+    assert schedule_worker._tick(took_over=True) == (True, None)
+    db.expire_all()
+    runs = db.query(ScheduleRun).order_by(ScheduleRun.id).all()
+    assert [run.status for run in runs] == ["abandoned", "abandoned", "ok", "running"]
+    assert runs[0].finished_at is not None and runs[0].error
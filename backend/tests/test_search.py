@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from app.db.models.category import Category
+from app.db.models.item import Item
+from app.db.search import search_item_ids
+
+def indexed(db, item_id):
+    row = db.execute(
+        text("SELECT name, description, categories FROM items_fts WHERE rowid = :id"), {"id": item_id}
+    ).first()
+    return row and tuple(row)
+
+def search(db, q):
+    return search_item_ids(db, q, 20)[0]
+
+def test_item_edits_update_the_index(db):
+    pumps = Category(name="pumps", path="/1/")
+    item = Item(name="Hydraulic pump", description="Cast iron", price=10, categories=[pumps])
+    db.add(item)
+    db.commit()
+    assert indexed(db, item.id) == ("Hydraulic pump", "Cast iron", "pumps")
+    assert search(db, "hydraulic") == [item.id]
+    assert search(db, "pum") == [item.id]
+
+    item.name = "Pneumatic valve"
+    db.commit()
+    assert search(db, "hydraulic") == []
+    assert search(db, "pneumatic") == [item.id]
+
+    item.categories = []
+    db.commit()
+    assert indexed(db, item.id)[2] == ""
+
+    db.delete(item)
+    db.commit()
+    assert indexed(db, item.id) is None
+    assert search(db, "pneumatic") == []
+
+def test_category_edits_reindex_their_items(db):
+    category = Category(name="valves", path="/1/")
+    items = [Item(name=f"part {i}", price=1, categories=[category]) for i in range(3)]
+    db.add_all(items)
+    db.commit()
+    ids = sorted(item.id for item in items)
+    assert sorted(search(db, "valves")) == ids
+
+    category.name = "fittings"
+    db.commit()
+    assert search(db, "valves") == []
+    assert sorted(search(db, "fittings")) == ids
+
+    db.delete(category)
+    db.commit()
+    assert search(db, "fittings") == []
+    assert all(indexed(db, id)[2] == "" for id in ids)
+
+def test_name_matches_rank_first(db):
+    in_description = Item(name="Gasket", description="fits the hydraulic pump", price=1)
+    in_name = Item(name="Hydraulic hose", price=1)
+    db.add_all([in_description, in_name])
+    db.commit()
+    assert search(db, "hydraulic") == [in_name.id, in_description.id]
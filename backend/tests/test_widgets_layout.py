@@ -0,0 +1,37 @@
+from app.db.models.widget import Widget
+from app.routes.widgets import router as widgets_router
+
+def seed(db, n=2):
+    widgets = [Widget(type="clock", enabled=True, pos={"x": i, "y": 0}, size={"w": 2, "h": 2}) for i in range(n)]
+    db.add_all(widgets)
+    db.commit()
+    return [w.id for w in widgets]
+
+def test_layout_save_bumps_versions(client, db):
+    ids = seed(db)
+    c = client(widgets_router)
+    r = c.patch("/api/v1/widgets/layout", json={"widgets": [{"id": id, "version": 1, "pos": {"x": 5}} for id in ids]})
+    assert r.status_code == 200
+    assert r.json() == {"widgets": [{"id": id, "version": 2} for id in ids]}
+    assert [w["pos"] for w in c.get("/api/v1/widgets/").json()] == [{"x": 5}, {"x": 5}]
+
+def test_stale_layout_is_rejected_whole(client, db):
+    first, second = seed(db)
+    c = client(widgets_router)
+    c.patch("/api/v1/widgets/layout", json={"widgets": [{"id": second, "version": 1, "pos": {"x": 9}}]})
+    r = c.patch("/api/v1/widgets/layout", json={"widgets": [
+        {"id": first, "version": 1, "pos": {"x": 7}},
+        {"id": second, "version": 1, "pos": {"x": 7}},
+    ]})
+    assert r.status_code == 409
+    assert r.json()["detail"]["stale"] == [{"id": second, "version": 2}]
+    # The fresh widget's update was rolled back with the stale one
+    widgets = {w["id"]: w for w in c.get("/api/v1/widgets/").json()}
+    assert widgets[first]["pos"] == {"x": 0, "y": 0} and widgets[first]["version"] == 1
+    assert widgets[second]["pos"] == {"x": 9}
+
+def test_duplicate_ids_are_rejected(client, db):
+    (widget_id,) = seed(db, 1)
+    c = client(widgets_router)
+    r = c.patch("/api/v1/widgets/layout", json={"widgets": [{"id": widget_id, "version": 1}] * 2})
+    assert r.status_code == 400